@@ -0,0 +1,243 @@
+from math import ceil
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.db import IntegrityError
+from django.http import Http404, HttpResponse
+from django.shortcuts import redirect
+from django.utils.cache import patch_vary_headers
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import serializers, status
+from rest_framework.exceptions import (APIException, NotAuthenticated,
+                                       NotFound, Throttled)
+from rest_framework.settings import api_settings
+
+from api.authentication import CachedTokenAuthentication
+from api.renderers import ORJSONRenderer
+from api.serializers import (FavouriteAndShoppingCrtSerializer,
+                             SubscribeSerializer)
+from api.views import (IngredientViewSet, RecipeRedirectView, RecipeViewSet,
+                       encoded_response)
+from recipes.catalog import get_catalog
+from recipes.models import Favourite, Recipe, ShoppingCart
+from users.models import Subscription, User
+from users.views import UserViewSet
+
+renderer = ORJSONRenderer()
+
+
+def json_response(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(
+        renderer.render(data), status=status_code,
+        content_type='application/json')
+
+
+def no_content_response():
+    response = HttpResponse(status=status.HTTP_204_NO_CONTENT)
+    del response['Content-Type']
+    return response
+
+
+async def aget_object_or_404(model, **kwargs):
+    try:
+        return await model.objects.aget(**kwargs)
+    except (model.DoesNotExist, ValueError):
+        raise Http404(
+            f'No {model._meta.object_name} matches the given query.')
+
+
+class AsyncAPIView(View):
+    async_methods = ('get', 'post', 'delete')
+    authenticator = CachedTokenAuthentication()
+    authentication_required = False
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+    throttle_scope = None
+    sync_view = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def accepts_json(self, request):
+        return ('format' not in request.GET
+                and 'text/html' not in request.headers.get('Accept', ''))
+
+    async def authenticate(self, request):
+        if 'HTTP_AUTHORIZATION' not in request.META:
+            return AnonymousUser()
+        result = await sync_to_async(self.authenticator.authenticate)(request)
+        return AnonymousUser() if result is None else result[0]
+
+    def check_throttles(self, request):
+        waits = [
+            throttle.wait() for throttle in (
+                throttle_class() for throttle_class in self.throttle_classes)
+            if not throttle.allow_request(request, self)
+        ]
+        if waits:
+            raise Throttled(max(
+                (wait for wait in waits if wait is not None), default=None))
+
+    def handle_exception(self, exc):
+        if isinstance(exc, Http404):
+            exc = NotFound(*exc.args)
+        response = json_response(
+            {'detail': str(exc.detail)}, exc.status_code)
+        if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+            response['WWW-Authenticate'] = (
+                self.authenticator.authenticate_header(None))
+        if isinstance(exc, Throttled) and exc.wait is not None:
+            response['Retry-After'] = str(ceil(exc.wait))
+        return response
+
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        handler = (getattr(self, method, None)
+                   if method in self.async_methods else None)
+        if handler is None or not self.accepts_json(request):
+            return await sync_to_async(self.sync_view)(
+                request, *args, **kwargs)
+        try:
+            request.user = await self.authenticate(request)
+            if (self.authentication_required
+                    and not request.user.is_authenticated):
+                raise NotAuthenticated()
+            self.check_throttles(request)
+            response = await handler(request, *args, **kwargs)
+        except (APIException, Http404) as exc:
+            response = self.handle_exception(exc)
+        response['Allow'] = self.allow_header
+        patch_vary_headers(response, ('Accept',))
+        return response
+
+    @property
+    def allow_header(self):
+        methods = set(getattr(self.sync_view, 'actions', None) or ['get'])
+        if 'get' in methods:
+            methods.add('head')
+        methods.add('options')
+        return ', '.join(
+            method.upper() for method in self.http_method_names
+            if method in methods)
+
+
+class RecipeListView(AsyncAPIView):
+    authentication_required = True
+    model = None
+    exists_message = None
+    missing_message = None
+
+    async def post(self, request, pk):
+        recipe = await aget_object_or_404(Recipe, id=pk)
+        if await self.model.objects.filter(
+                user=request.user, recipe=recipe).aexists():
+            return json_response(
+                {'errors': str(serializers.ValidationError(
+                    {'non_field_errors': [self.exists_message]}))},
+                status.HTTP_400_BAD_REQUEST,
+            )
+        await self.model.objects.acreate(user=request.user, recipe=recipe)
+        return json_response(
+            FavouriteAndShoppingCrtSerializer(recipe).data,
+            status.HTTP_201_CREATED,
+        )
+
+    async def delete(self, request, pk):
+        recipe = await aget_object_or_404(Recipe, id=pk)
+        deleted, _ = await self.model.objects.filter(
+            user=request.user, recipe=recipe).adelete()
+        if not deleted:
+            return json_response(
+                {'errors': str(serializers.ValidationError(
+                    self.missing_message))},
+                status.HTTP_400_BAD_REQUEST,
+            )
+        return no_content_response()
+
+
+class FavoriteView(RecipeListView):
+    model = Favourite
+    exists_message = 'Рецепт уже был добавлен в избранное.'
+    missing_message = 'Рецепт уже был удален из избранного.'
+    sync_view = staticmethod(RecipeViewSet.as_view(
+        {'post': 'favorite_post', 'delete': 'favorite_delete'},
+        basename='recipes', detail=True,
+        **RecipeViewSet.favorite_post.kwargs,
+    ))
+
+
+class ShoppingCartView(RecipeListView):
+    model = ShoppingCart
+    exists_message = 'Рецепт уже был добавлен в корзину.'
+    missing_message = 'Рецепт уже был удален из корзины.'
+    sync_view = staticmethod(RecipeViewSet.as_view(
+        {'post': 'shopping_cart_post', 'delete': 'shopping_cart_delete'},
+        basename='recipes', detail=True,
+        **RecipeViewSet.shopping_cart_post.kwargs,
+    ))
+
+
+class SubscribeView(AsyncAPIView):
+    authentication_required = True
+    sync_view = staticmethod(UserViewSet.as_view(
+        {'post': 'subscribe_post', 'delete': 'subscribe_delete'},
+        basename='users', detail=True,
+        **UserViewSet.subscribe_post.kwargs,
+    ))
+
+    async def post(self, request, id):
+        subscribing = await aget_object_or_404(User, pk=id)
+        if subscribing == request.user:
+            return json_response(
+                {'subscribing': ['Вы не можете подписаться сами на себя.']},
+                status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            subscription = await Subscription.objects.acreate(
+                user=request.user, subscribing=subscribing)
+        except IntegrityError:
+            return json_response(
+                {'non_field_errors': [
+                    'Вы уже подписаны на этого пользователя.']},
+                status.HTTP_400_BAD_REQUEST,
+            )
+        data = await sync_to_async(
+            lambda: SubscribeSerializer(
+                subscription, context={'request': request}).data
+        )()
+        return json_response(data, status.HTTP_201_CREATED)
+
+    async def delete(self, request, id):
+        subscribing = await aget_object_or_404(User, pk=id)
+        deleted, _ = await Subscription.objects.filter(
+            user=request.user, subscribing=subscribing).adelete()
+        if not deleted:
+            return json_response(
+                {'errors': 'Вы не подписаны на пользователя.'},
+                status.HTTP_400_BAD_REQUEST,
+            )
+        return no_content_response()
+
+
+class IngredientListView(AsyncAPIView):
+    throttle_scope = 'ingredients'
+    sync_view = staticmethod(IngredientViewSet.as_view(
+        {'get': 'list'}, basename='ingredients', detail=False,
+        suffix='List'))
+
+    async def get(self, request):
+        catalog = await sync_to_async(get_catalog)()
+        if 'name' in request.GET:
+            return json_response(
+                catalog.search_ingredients(request.GET['name']))
+        return encoded_response(
+            request, catalog.ingredients_json, catalog.ingredients_gzip)
+
+
+class AsyncRecipeRedirectView(AsyncAPIView):
+    sync_view = staticmethod(RecipeRedirectView.as_view())
+
+    async def get(self, request, pk):
+        recipe = await aget_object_or_404(Recipe, pk=pk)
+        return redirect(recipe.full_link)
@@ -0,0 +1,101 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from hashlib import sha256
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from recipes.versions import auth_version, get_version
+from users.constants import (LOCAL_CACHE_BACKENDS, TOKEN_CACHE_SIZE,
+                             TOKEN_CACHE_TIMEOUT, TOKEN_SHARED_CACHE_TIMEOUT)
+from users.models import User
+
+
+def token_cache_key(key):
+    return f'auth_token:{sha256(key.encode()).hexdigest()}'
+
+
+def is_cache_shared():
+    return settings.CACHES['default']['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+
+class LocalTokenCache:
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    local_cache = LocalTokenCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TIMEOUT)
+
+    def get_shared(self, key):
+        if not settings.TOKEN_SHARED_CACHE:
+            return None
+        entry = cache.get(token_cache_key(key))
+        if entry is None:
+            return None
+        user_id, version = entry
+        if get_version(auth_version(user_id)) != version:
+            return None
+        user = User.objects.filter(pk=user_id, is_active=True).first()
+        if user is None:
+            return None
+        return user, version
+
+    def get_cached(self, key):
+        entry = self.local_cache.get(key)
+        if entry is not None:
+            user, version = entry
+            if get_version(auth_version(user.pk)) == version:
+                return user
+            self.local_cache.delete(key)
+        entry = self.get_shared(key)
+        if entry is None:
+            return None
+        self.local_cache.set(key, entry)
+        return entry[0]
+
+    def authenticate_credentials(self, key):
+        if not is_cache_shared():
+            return super().authenticate_credentials(key)
+        user = self.get_cached(key)
+        if user is None:
+            user, token = super().authenticate_credentials(key)
+            version = get_version(auth_version(user.pk))
+            self.local_cache.set(key, (user, version))
+            if settings.TOKEN_SHARED_CACHE:
+                cache.set(
+                    token_cache_key(key), (user.pk, version),
+                    TOKEN_SHARED_CACHE_TIMEOUT)
+        user = copy.copy(user)
+        return user, Token(key=key, user=user)
@@ -0,0 +1,34 @@
+from functools import wraps
+from hashlib import md5
+
+from django.utils.cache import get_conditional_response
+
+from recipes.versions import CATALOG_VERSION, get_versions, user_state_version
+
+
+def make_etag(request, *parts):
+    names = [CATALOG_VERSION]
+    if request.user.is_authenticated:
+        names.append(user_state_version(request.user.pk))
+    versions = get_versions(names)
+    state = ':'.join(
+        str(part) for part in (*parts, *(versions[name] for name in names)))
+    return f'"{md5(state.encode()).hexdigest()}"'
+
+
+def conditional(state_method):
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            state = getattr(self, state_method)(request, *args, **kwargs)
+            if state is None:
+                return method(self, request, *args, **kwargs)
+            etag = make_etag(request, *state)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = method(self, request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+            return response
+        return wrapper
+    return decorator
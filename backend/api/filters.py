@@ -1,18 +1,49 @@
 from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef
 from django_filters.rest_framework import FilterSet, filters
 
-from recipes.models import Ingredient, Recipe
+from recipes.catalog import get_tag_choices, get_tag_ids
+from recipes.models import Ingredient, Recipe, RecipeTag
 
 User = get_user_model()
 
+RECIPE_ORDERINGS = {
+    'popular': ('-favorites_count', '-id'),
+    'trending': ('-trending_score', '-id'),
+}
+
+
+class TagSlugFilter(filters.MultipleChoiceFilter):
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('choices', get_tag_choices)
+        super().__init__(*args, **kwargs)
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        return qs.filter(Exists(RecipeTag.objects.filter(
+            recipe=OuterRef('pk'),
+            tag_id__in=get_tag_ids(value),
+        )))
+
+
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    pass
+
 
 class RecipeFilter(FilterSet):
 
-    tags = filters.AllValuesMultipleFilter(field_name='tags__slug')
+    ids = NumberInFilter(field_name='id', lookup_expr='in')
+    tags = TagSlugFilter()
 
     is_favorited = filters.BooleanFilter(method='filter_is_favorited')
     is_in_shopping_cart = filters.BooleanFilter(
         method='filter_is_in_shopping_cart')
+    ordering = filters.ChoiceFilter(
+        choices=[(ordering, ordering) for ordering in RECIPE_ORDERINGS],
+        method='filter_ordering',
+    )
 
     class Meta:
         model = Recipe
@@ -32,6 +63,9 @@ class RecipeFilter(FilterSet):
                 return queryset.filter(shopping_carts__user=user)
         return queryset
 
+    def filter_ordering(self, queryset, name, value):
+        return queryset.order_by(*RECIPE_ORDERINGS[value])
+
 
 class IngredientFilter(FilterSet):
     name = filters.CharFilter(lookup_expr='icontains')
@@ -0,0 +1,66 @@
+from django.core.cache import cache
+
+from api.representations import build_recipe_fragments, with_flags
+from foodgram.db_router import use_primary
+from recipes.constants import RECIPE_FRAGMENT_TIMEOUT
+from recipes.membership import get_membership
+from recipes.versions import (CATALOG_VERSION, author_version, get_versions,
+                              recipe_version)
+
+
+def get_recipe_fragments(recipes, build_absolute_uri):
+    base_url = build_absolute_uri('/')
+    versions = get_versions(
+        [CATALOG_VERSION]
+        + [recipe_version(recipe_id) for recipe_id, _ in recipes]
+        + [author_version(author_id) for _, author_id in recipes]
+    )
+    keys = {
+        recipe_id: (
+            f'recipe_fragment:{base_url}:{recipe_id}'
+            f':{versions[recipe_version(recipe_id)]}'
+            f':{versions[author_version(author_id)]}'
+            f':{versions[CATALOG_VERSION]}'
+        )
+        for recipe_id, author_id in recipes
+    }
+    cached = cache.get_many(keys.values())
+    fragments = {
+        recipe_id: cached[key]
+        for recipe_id, key in keys.items() if key in cached
+    }
+    missing = [recipe_id for recipe_id in keys if recipe_id not in fragments]
+    if missing:
+        with use_primary():
+            built = build_recipe_fragments(missing, build_absolute_uri)
+        cache.set_many(
+            {keys[recipe_id]: built[recipe_id] for recipe_id in built},
+            RECIPE_FRAGMENT_TIMEOUT,
+        )
+        fragments.update(built)
+    return fragments
+
+
+def get_user_flags(user, recipe_ids):
+    if user.is_anonymous:
+        return set(), set()
+    membership = get_membership(user)
+    return (
+        {recipe_id for recipe_id in recipe_ids
+         if membership.is_favorited(recipe_id)},
+        {recipe_id for recipe_id in recipe_ids
+         if membership.is_in_shopping_cart(recipe_id)},
+    )
+
+
+def assemble_recipes(recipes, request):
+    fragments = get_recipe_fragments(recipes, request.build_absolute_uri)
+    favorited, in_shopping_cart = get_user_flags(request.user, list(fragments))
+    return [
+        with_flags(
+            fragments[recipe_id],
+            recipe_id in favorited,
+            recipe_id in in_shopping_cart,
+        )
+        for recipe_id, _ in recipes if recipe_id in fragments
+    ]
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import ORJSONRenderer
+from api.representations import build_recipe_fragments, with_flags
+from api.serializers import (IngredientSerializer, RecipeReadSerializer,
+                             TagSerializer)
+from recipes.catalog import get_catalog
+from recipes.models import Ingredient, Recipe, Tag
+
+
+class Command(BaseCommand):
+
+    help = ('Сверяет ответы быстрого пути чтения с ответами сериализаторов '
+            'байт в байт')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=1000,
+            help='Сколько последних рецептов сравнить.')
+        parser.add_argument(
+            '--host', default=settings.ALLOWED_HOSTS[0],
+            help='Хост для построения абсолютных ссылок.')
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/', HTTP_HOST=options['host'])
+        request.user = AnonymousUser()
+        mismatches = 0
+
+        recipes = Recipe.objects.all()[:options['limit']]
+        expected = RecipeReadSerializer(
+            recipes, many=True, context={'request': request}).data
+        recipe_ids = list(recipes.values_list('id', flat=True))
+        fragments = build_recipe_fragments(
+            recipe_ids, request.build_absolute_uri)
+        actual = [
+            with_flags(fragments[recipe_id]) for recipe_id in recipe_ids
+            if recipe_id in fragments
+        ]
+        for expected_item, actual_item in zip(expected, actual):
+            if (JSONRenderer().render(expected_item)
+                    != ORJSONRenderer().render(actual_item)):
+                mismatches += 1
+                self.stderr.write(
+                    f'Рецепт {expected_item["id"]} отличается.')
+        if len(expected) != len(actual):
+            mismatches += 1
+            self.stderr.write('Различается количество рецептов.')
+
+        catalog = get_catalog()
+        if (JSONRenderer().render(
+                TagSerializer(Tag.objects.all(), many=True).data)
+                != catalog.tags_json):
+            mismatches += 1
+            self.stderr.write('Список тегов отличается.')
+        if (JSONRenderer().render(
+                IngredientSerializer(Ingredient.objects.all(), many=True).data)
+                != catalog.ingredients_json):
+            mismatches += 1
+            self.stderr.write('Список ингредиентов отличается.')
+
+        if mismatches:
+            raise CommandError(f'Найдено расхождений: {mismatches}.')
+        self.stdout.write(f'Проверено рецептов: {len(expected)}.')
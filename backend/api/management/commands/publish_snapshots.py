@@ -0,0 +1,85 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from api.snapshots import publish_recipes, unpublish_recipe, write_atomic
+from recipes.constants import SNAPSHOT_BATCH_SIZE, SNAPSHOT_OVERLAP_SECONDS
+from recipes.models import Recipe
+
+LAST_RUN_FILE = '.published'
+
+
+def publish_batch(recipe_ids):
+    publish_recipes(recipe_ids)
+    return len(recipe_ids)
+
+
+class Command(BaseCommand):
+
+    help = 'Пересобирает статические снимки страниц рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Количество процессов.')
+        parser.add_argument(
+            '--batch-size', type=int, default=SNAPSHOT_BATCH_SIZE,
+            help='Количество рецептов в одном задании.')
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Пересобрать все снимки, а не только изменённые.')
+
+    def handle(self, *args, **options):
+        if not settings.SNAPSHOT_ROOT:
+            raise CommandError('Не задан SNAPSHOT_ROOT.')
+        started = timezone.now()
+        last_run = None if options['full'] else self.get_last_run()
+        recipes = Recipe.objects.order_by('id')
+        if last_run is not None:
+            recipes = recipes.filter(updated_at__gte=last_run - timedelta(
+                seconds=SNAPSHOT_OVERLAP_SECONDS))
+        recipe_ids = list(recipes.values_list('id', flat=True))
+        batch_size = options['batch_size']
+        batches = [
+            recipe_ids[start:start + batch_size]
+            for start in range(0, len(recipe_ids), batch_size)
+        ]
+        connections.close_all()
+        with ProcessPoolExecutor(
+                max_workers=options['workers'],
+                mp_context=multiprocessing.get_context('fork')) as pool:
+            published = sum(pool.map(publish_batch, batches))
+        removed = 0 if last_run is not None else self.prune(set(recipe_ids))
+        write_atomic(
+            os.path.join(settings.SNAPSHOT_ROOT, LAST_RUN_FILE),
+            started.isoformat().encode())
+        self.stdout.write(
+            f'Опубликовано рецептов: {published}. Удалено снимков: {removed}.')
+
+    def get_last_run(self):
+        try:
+            with open(os.path.join(
+                    settings.SNAPSHOT_ROOT, LAST_RUN_FILE)) as last_run_file:
+                return datetime.fromisoformat(last_run_file.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def prune(self, recipe_ids):
+        directory = os.path.join(settings.SNAPSHOT_ROOT, 'recipes')
+        if not os.path.isdir(directory):
+            return 0
+        removed = 0
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name, extension = os.path.splitext(entry.name)
+                if (extension == '.json' and name.isdigit()
+                        and int(name) not in recipe_ids):
+                    unpublish_recipe(int(name))
+                    removed += 1
+        return removed
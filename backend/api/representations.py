@@ -0,0 +1,96 @@
+from collections import defaultdict
+
+from django.core.files.storage import default_storage
+from django.db.models import Exists, OuterRef
+
+from recipes.models import Recipe, RecipeIngredient, RecipeTag
+from users.models import Subscription, User
+
+RECIPE_FIELDS = ('id', 'name', 'image', 'text', 'author_id', 'cooking_time')
+AUTHOR_FIELDS = (
+    'id', 'email', 'username', 'first_name', 'last_name', 'avatar')
+
+
+def file_url(name, build_absolute_uri):
+    if not name:
+        return None
+    return build_absolute_uri(default_storage.url(name))
+
+
+def build_authors(author_ids, build_absolute_uri):
+    authors = (
+        User.objects
+        .filter(id__in=author_ids)
+        .annotate(is_subscribed=Exists(
+            Subscription.objects.filter(user=OuterRef('pk'))))
+        .values(*AUTHOR_FIELDS, 'is_subscribed')
+    )
+    return {
+        author['id']: {
+            **author,
+            'avatar': file_url(author['avatar'], build_absolute_uri),
+        }
+        for author in authors
+    }
+
+
+def build_ingredients(recipe_ids):
+    ingredients = defaultdict(list)
+    rows = (
+        RecipeIngredient.objects
+        .filter(recipe_id__in=recipe_ids)
+        .values_list(
+            'recipe_id', 'ingredient_id', 'ingredient__name',
+            'ingredient__measurement_unit', 'amount',
+        )
+    )
+    for recipe_id, ingredient_id, name, measurement_unit, amount in rows:
+        ingredients[recipe_id].append({
+            'id': ingredient_id,
+            'name': name,
+            'measurement_unit': measurement_unit,
+            'amount': amount,
+        })
+    return ingredients
+
+
+def build_tags(recipe_ids):
+    tags = defaultdict(list)
+    rows = (
+        RecipeTag.objects
+        .filter(recipe_id__in=recipe_ids)
+        .order_by('tag__name')
+        .values_list('recipe_id', 'tag_id', 'tag__name', 'tag__slug')
+    )
+    for recipe_id, tag_id, name, slug in rows:
+        tags[recipe_id].append({'id': tag_id, 'name': name, 'slug': slug})
+    return tags
+
+
+def build_recipe_fragments(recipe_ids, build_absolute_uri):
+    rows = Recipe.objects.filter(id__in=recipe_ids).values(*RECIPE_FIELDS)
+    authors = build_authors(
+        {row['author_id'] for row in rows}, build_absolute_uri)
+    ingredients = build_ingredients(recipe_ids)
+    tags = build_tags(recipe_ids)
+    return {
+        row['id']: {
+            'id': row['id'],
+            'name': row['name'],
+            'image': file_url(row['image'], build_absolute_uri),
+            'text': row['text'],
+            'author': authors[row['author_id']],
+            'ingredients': ingredients[row['id']],
+            'tags': tags[row['id']],
+            'cooking_time': row['cooking_time'],
+        }
+        for row in rows
+    }
+
+
+def with_flags(fragment, is_favorited=False, is_in_shopping_cart=False):
+    return {
+        **fragment,
+        'is_in_shopping_cart': is_in_shopping_cart,
+        'is_favorited': is_favorited,
+    }
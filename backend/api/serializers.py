@@ -1,10 +1,12 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
 from api.fields import Base64ImageField
 from recipes.constants import MAX, MIN
+from recipes.membership import get_membership
 from recipes.models import Ingredient, Recipe, RecipeIngredient, RecipeTag, Tag
 from users.models import Subscription
 from users.serializers import UserSerializer
@@ -99,21 +101,49 @@ class RecipeReadSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart', 'is_favorited',
         )
 
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = self.context.get('fields')
+        if selected is None:
+            return fields
+        return {name: fields[name] for name in selected}
+
     def get_user(self):
         request = self.context.get('request')
         return request.user if request else None
 
-    def get_is_favorited(self, obj):
+    def get_membership(self):
         user = self.get_user()
-        if user and not user.is_anonymous:
-            return obj.favorites.filter(user=user).exists()
-        return False
+        if not user or user.is_anonymous:
+            return None
+        if 'membership' not in self.context:
+            self.context['membership'] = get_membership(user)
+        return self.context['membership']
+
+    def get_is_favorited(self, obj):
+        membership = self.get_membership()
+        return membership is not None and membership.is_favorited(obj.pk)
 
     def get_is_in_shopping_cart(self, obj):
-        user = self.get_user()
-        if user and not user.is_anonymous:
-            return obj.shopping_carts.filter(user=user).exists()
-        return False
+        membership = self.get_membership()
+        return (membership is not None
+                and membership.is_in_shopping_cart(obj.pk))
+
+
+class RecipeCoverageSerializer(RecipeReadSerializer):
+    covered_ingredients = serializers.SerializerMethodField()
+    missing_ingredients = serializers.SerializerMethodField()
+
+    class Meta(RecipeReadSerializer.Meta):
+        fields = RecipeReadSerializer.Meta.fields + (
+            'covered_ingredients', 'missing_ingredients',
+        )
+
+    def get_covered_ingredients(self, obj):
+        return self.context['coverage'][obj.id][0]
+
+    def get_missing_ingredients(self, obj):
+        return self.context['coverage'][obj.id][1]
 
 
 class RecipeSerializer(serializers.ModelSerializer):
@@ -145,6 +175,7 @@ class RecipeSerializer(serializers.ModelSerializer):
             ) for ingredient in ingredients
         )
 
+    @transaction.atomic
     def create(self, validated_data):
         recipe = Recipe.objects.create(
             author=self.context.get('request').user,
@@ -158,6 +189,7 @@ class RecipeSerializer(serializers.ModelSerializer):
         )
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         instance.ingredients.clear()
         instance.tags.clear()
@@ -216,7 +248,7 @@ class SubscribingSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if request is None or request.user.is_anonymous:
             return False
-        return object.author.filter(subscriber=request.user).exists()
+        return obj.subscribing.filter(user=request.user).exists()
 
     def get_recipes(self, object):
         recipes = object.recipes.all()[:3]
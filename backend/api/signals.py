@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from api.snapshots import schedule_publish, schedule_unpublish
+from recipes.models import Ingredient, Recipe, RecipeIngredient, RecipeTag, Tag
+from users.constants import PUBLIC_USER_FIELDS
+from users.models import Subscription, User
+
+CATALOG_FIELDS = {
+    Tag: ('name', 'slug'),
+    Ingredient: ('name', 'measurement_unit'),
+}
+CATALOG_RECIPES = {Tag: 'tags', Ingredient: 'ingredients'}
+
+
+def mark_stale(recipes):
+    if settings.SNAPSHOT_ROOT:
+        recipes.update(updated_at=timezone.now())
+
+
+def get_snapshot_fields(sender):
+    return PUBLIC_USER_FIELDS if sender is User else CATALOG_FIELDS[sender]
+
+
+def snapshot_fields_changed(sender, instance):
+    previous = instance.__dict__.pop('_previous_snapshot', None)
+    if previous is None:
+        return False
+    return previous != tuple(
+        sender._meta.get_field(field).get_prep_value(getattr(instance, field))
+        for field in get_snapshot_fields(sender)
+    )
+
+
+def mark_subscriber_recipes(subscription):
+    if not Subscription.objects.filter(user_id=subscription.user_id).exclude(
+            pk=subscription.pk).exists():
+        mark_stale(Recipe.objects.filter(author_id=subscription.user_id))
+
+
+@receiver(post_save, sender=Recipe)
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+@receiver((post_save, post_delete), sender=RecipeTag)
+def recipe_snapshot_changed(sender, instance, **kwargs):
+    schedule_publish(
+        [instance.pk if sender is Recipe else instance.recipe_id])
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_snapshot_deleted(instance, **kwargs):
+    schedule_unpublish(instance.pk)
+
+
+@receiver(pre_save, sender=User)
+@receiver(pre_save, sender=Tag)
+@receiver(pre_save, sender=Ingredient)
+def snapshot_fields_changing(sender, instance, update_fields, **kwargs):
+    fields = get_snapshot_fields(sender)
+    if not settings.SNAPSHOT_ROOT or instance.pk is None:
+        return
+    if update_fields is None or set(fields) & set(update_fields):
+        instance._previous_snapshot = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list(*fields).first())
+
+
+@receiver(post_save, sender=User)
+def author_snapshots_changed(sender, instance, **kwargs):
+    if snapshot_fields_changed(sender, instance):
+        mark_stale(Recipe.objects.filter(author=instance))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+def catalog_snapshots_changed(sender, instance, **kwargs):
+    if snapshot_fields_changed(sender, instance):
+        mark_stale(Recipe.objects.filter(
+            **{CATALOG_RECIPES[sender]: instance}))
+
+
+@receiver(post_save, sender=Subscription)
+def subscription_snapshots_created(instance, created, **kwargs):
+    if created:
+        mark_subscriber_recipes(instance)
+
+
+@receiver(post_delete, sender=Subscription)
+def subscription_snapshots_deleted(instance, **kwargs):
+    mark_subscriber_recipes(instance)
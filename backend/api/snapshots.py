@@ -0,0 +1,92 @@
+import os
+import tempfile
+import threading
+from functools import partial
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.db import transaction
+from django.template.loader import render_to_string
+
+from api.renderers import ORJSONRenderer
+from api.representations import build_recipe_fragments, with_flags
+from foodgram.db_router import use_primary
+
+renderer = ORJSONRenderer()
+pending = threading.local()
+
+
+def build_absolute_uri(path):
+    return urljoin(settings.SNAPSHOT_BASE_URL, path)
+
+
+def snapshot_paths(recipe_id):
+    return (
+        os.path.join(settings.SNAPSHOT_ROOT, 'recipes', f'{recipe_id}.json'),
+        os.path.join(settings.SNAPSHOT_ROOT, 'r', str(recipe_id),
+                     'index.html'),
+    )
+
+
+def write_atomic(path, content):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(descriptor, 'wb') as temp_file:
+            temp_file.write(content)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def unpublish_recipe(recipe_id):
+    for path in snapshot_paths(recipe_id):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    try:
+        os.rmdir(os.path.dirname(snapshot_paths(recipe_id)[1]))
+    except OSError:
+        pass
+
+
+def publish_recipes(recipe_ids):
+    with use_primary():
+        fragments = build_recipe_fragments(recipe_ids, build_absolute_uri)
+    for recipe_id in recipe_ids:
+        if recipe_id not in fragments:
+            unpublish_recipe(recipe_id)
+            continue
+        recipe = with_flags(fragments[recipe_id])
+        json_path, html_path = snapshot_paths(recipe_id)
+        write_atomic(json_path, renderer.render(recipe))
+        write_atomic(html_path, render_to_string('api/recipe_share.html', {
+            'recipe': recipe,
+            'url': build_absolute_uri(f'/recipes/{recipe_id}'),
+        }).encode())
+
+
+def publish_pending():
+    recipe_ids = getattr(pending, 'recipe_ids', None)
+    if recipe_ids:
+        pending.recipe_ids = set()
+        publish_recipes(sorted(recipe_ids))
+
+
+def schedule_publish(recipe_ids):
+    if not settings.SNAPSHOT_ROOT:
+        return
+    if not hasattr(pending, 'recipe_ids'):
+        pending.recipe_ids = set()
+    pending.recipe_ids.update(recipe_ids)
+    transaction.on_commit(publish_pending)
+
+
+def schedule_unpublish(recipe_id):
+    if settings.SNAPSHOT_ROOT:
+        transaction.on_commit(partial(unpublish_recipe, recipe_id))
@@ -0,0 +1,370 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.http import HttpResponse
+from django.test import (RequestFactory, SimpleTestCase, TestCase,
+                         TransactionTestCase, override_settings)
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+
+from api.authentication import CachedTokenAuthentication
+from foodgram.db_router import replica_pool
+from foodgram.middleware import RECENT_WRITE_COOKIE, ReplicaMiddleware
+from foodgram.sharedmem import COUNTER, CacheBuckets, MmapBuckets, MmapCounters
+from recipes.models import (Favourite, Ingredient, Recipe, RecipeIngredient,
+                            RecipeTag, ShoppingCart, Tag)
+from users.models import Subscription, User
+
+
+class ReadPathContractTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author, cls.reader = (
+            User.objects.create_user(
+                email=f'{name}@example.com', username=name,
+                first_name=name, last_name=name, password='password',
+                avatar='users/avatar/avatar.png' if name == 'author' else None)
+            for name in ('author', 'reader')
+        )
+        Subscription.objects.create(user=cls.author, subscribing=cls.reader)
+        tags = [
+            Tag.objects.create(name=name, slug=name)
+            for name in ('breakfast', 'lunch')
+        ]
+        ingredients = [
+            Ingredient.objects.create(name=f'Ингредиент {number}',
+                                      measurement_unit='г')
+            for number in range(3)
+        ]
+        cls.recipes = []
+        for number in range(4):
+            recipe = Recipe.objects.create(
+                name=f'Рецепт {number}', text='Текст "с кавычками"\n',
+                cooking_time=number + 1, author=cls.author,
+                image='recipes/images/test.png')
+            RecipeTag.objects.create(recipe=recipe, tag=tags[number % 2])
+            for ingredient in ingredients[:number + 1]:
+                RecipeIngredient.objects.create(
+                    recipe=recipe, ingredient=ingredient, amount=number + 1)
+            cls.recipes.append(recipe)
+        Favourite.objects.create(user=cls.reader, recipe=cls.recipes[0])
+        ShoppingCart.objects.create(user=cls.reader, recipe=cls.recipes[1])
+        cls.token = Token.objects.create(user=cls.reader)
+
+    def fetch(self, url, fast, authenticated=False):
+        client = APIClient()
+        if authenticated:
+            client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        cache.clear()
+        with override_settings(FAST_READ_PATH=fast):
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.content
+
+    def assertSameBytes(self, url, authenticated=False):
+        self.assertEqual(
+            self.fetch(url, False, authenticated),
+            self.fetch(url, True, authenticated),
+        )
+
+    def test_list(self):
+        self.assertSameBytes('/api/recipes/')
+        self.assertSameBytes('/api/recipes/?tags=lunch&limit=1&page=2')
+
+    def test_detail(self):
+        self.assertSameBytes(f'/api/recipes/{self.recipes[2].pk}/')
+
+    def test_sparse_fields(self):
+        self.assertSameBytes('/api/recipes/?fields=id,name,author')
+        self.assertSameBytes(
+            f'/api/recipes/{self.recipes[3].pk}/?omit=ingredients,text')
+
+    def test_authenticated_flags(self):
+        content = self.fetch('/api/recipes/', True, authenticated=True)
+        self.assertIn(b'"is_favorited":true', content)
+        self.assertIn(b'"is_in_shopping_cart":true', content)
+        self.assertSameBytes('/api/recipes/', authenticated=True)
+        self.assertSameBytes(
+            '/api/recipes/?is_favorited=1', authenticated=True)
+        self.assertSameBytes(
+            f'/api/recipes/{self.recipes[1].pk}/', authenticated=True)
+
+
+@mock.patch('recipes.changelog.CHANGELOG_SETTLE_SECONDS', 0)
+class SyncTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='user@example.com', username='user',
+            first_name='user', last_name='user', password='password')
+        cls.recipes = [
+            Recipe.objects.create(
+                name=f'Рецепт {number}', text='Текст', cooking_time=5,
+                author=cls.user, image='recipes/images/test.png')
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def request(self, method, url):
+        with self.captureOnCommitCallbacks(execute=True):
+            return getattr(self.client, method)(url)
+
+    def test_snapshot(self):
+        self.request('post', f'/api/recipes/{self.recipes[0].pk}/favorite/')
+        data = self.client.get('/api/sync/').json()
+        self.assertTrue(data['reset'])
+        self.assertEqual(
+            data['favorites']['added'], [self.recipes[0].pk])
+
+    def test_delta(self):
+        token = self.client.get('/api/sync/').json()['token']
+        first, second, third = (recipe.pk for recipe in self.recipes)
+        self.request('post', f'/api/recipes/{first}/favorite/')
+        self.request('post', f'/api/recipes/{second}/favorite/')
+        self.request('delete', f'/api/recipes/{second}/favorite/')
+        self.request('post', f'/api/recipes/{third}/shopping_cart/')
+        data = self.client.get(f'/api/sync/?since={token}').json()
+        self.assertFalse(data['reset'])
+        self.assertEqual(data['favorites']['added'], [first])
+        self.assertEqual(data['shopping_cart']['added'], [third])
+
+    def test_invalid_token(self):
+        self.assertEqual(
+            self.client.get('/api/sync/?since=abc').status_code, 400)
+        self.assertTrue(
+            self.client.get('/api/sync/?since=999999').json()['reset'])
+
+
+class CachedTokenAuthenticationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='user@example.com', username='user',
+            first_name='user', last_name='user', password='password')
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overridden = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': directory.name,
+        }})
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+        self.key = self.token.key
+        self.local_cache = CachedTokenAuthentication.local_cache
+        self.local_cache.entries.clear()
+        self.addCleanup(self.local_cache.entries.clear)
+
+    def authenticate(self):
+        return CachedTokenAuthentication().authenticate_credentials(
+            self.key)[0]
+
+    def change_in_other_worker(self, change):
+        self.authenticate()
+        entries = dict(self.local_cache.entries)
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        self.local_cache.entries.update(entries)
+
+    def test_cached_user_skips_database(self):
+        self.authenticate()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate().pk, self.user.pk)
+
+    def test_token_delete_invalidates(self):
+        self.change_in_other_worker(self.token.delete)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_password_change_invalidates(self):
+        def change_password():
+            self.user.set_password('new-password')
+            self.user.save()
+
+        self.change_in_other_worker(change_password)
+        self.assertTrue(self.authenticate().check_password('new-password'))
+
+    def test_deactivation_invalidates(self):
+        def deactivate():
+            self.user.is_active = False
+            self.user.save()
+
+        self.change_in_other_worker(deactivate)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_local_cache_backend_disables_cache(self):
+        with override_settings(CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            self.authenticate()
+            self.assertFalse(self.local_cache.entries)
+            with self.assertNumQueries(1):
+                self.authenticate()
+
+
+REPLICA = 'replica_test'
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRoutingTests(TransactionTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.TemporaryDirectory()
+        connections.settings[REPLICA] = connections.configure_settings({
+            DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS],
+            REPLICA: {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': os.path.join(cls.directory.name, 'replica.sqlite3'),
+            },
+        })[REPLICA]
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        replica_pool.checked_at = None
+        self.factory = RequestFactory()
+        with connections[REPLICA].schema_editor() as editor:
+            editor.create_model(Tag)
+        Tag.objects.create(name='primary', slug='primary')
+        Tag.objects.using(REPLICA).create(name='replica', slug='replica')
+
+    def tearDown(self):
+        with connections[REPLICA].schema_editor() as editor:
+            editor.delete_model(Tag)
+
+    def request(self, method='get', write=False):
+        def view(request):
+            if write:
+                Tag.objects.create(name='new', slug='new')
+            return HttpResponse(','.join(
+                Tag.objects.order_by('slug').values_list('slug', flat=True)))
+
+        request = getattr(self.factory, method)('/')
+        return ReplicaMiddleware(view)(request)
+
+    def test_reads_use_replica(self):
+        response = self.request()
+        self.assertEqual(response.content, b'replica')
+        self.assertNotIn(RECENT_WRITE_COOKIE, response.cookies)
+
+    def test_reads_after_write_use_primary(self):
+        response = self.request(write=True)
+        self.assertEqual(response.content, b'new,primary')
+        self.assertIn(RECENT_WRITE_COOKIE, response.cookies)
+
+    def test_unsafe_method_uses_primary(self):
+        response = self.request('post')
+        self.assertEqual(response.content, b'primary')
+        self.assertIn(RECENT_WRITE_COOKIE, response.cookies)
+
+    def test_recent_write_cookie_uses_primary(self):
+        self.factory.cookies[RECENT_WRITE_COOKIE] = '1'
+        self.assertEqual(self.request().content, b'primary')
+
+    @mock.patch('foodgram.db_router.get_replica_lag',
+                side_effect=OperationalError)
+    def test_unavailable_replica_falls_back(self, get_replica_lag):
+        self.assertEqual(self.request().content, b'primary')
+
+    @override_settings(REPLICA_MAX_LAG=5)
+    @mock.patch('foodgram.db_router.get_replica_lag', return_value=60)
+    def test_lagging_replica_falls_back(self, get_replica_lag):
+        self.assertEqual(self.request().content, b'primary')
+
+
+class SharedMemoryTestCase(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overridden = override_settings(SHARED_MEMORY_DIR=directory.name)
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+
+
+class TokenBucketTests(SharedMemoryTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.stores = (MmapBuckets('test-buckets'), CacheBuckets())
+        cache.clear()
+
+    def test_capacity_then_reject(self):
+        for store in self.stores:
+            with self.subTest(store=type(store).__name__):
+                self.assertEqual(store.consume('ip', 2, 0.5), (True, 0))
+                self.assertEqual(store.consume('ip', 2, 0.5), (True, 0))
+                allowed, wait = store.consume('ip', 2, 0.5)
+                self.assertFalse(allowed)
+                self.assertGreater(wait, 0)
+                self.assertLessEqual(wait, 4)
+
+    def test_keys_are_independent(self):
+        for store in self.stores:
+            with self.subTest(store=type(store).__name__):
+                self.assertTrue(store.consume('first', 1, 0.1)[0])
+                self.assertTrue(store.consume('second', 1, 0.1)[0])
+                self.assertFalse(store.consume('first', 1, 0.1)[0])
+
+    @mock.patch('foodgram.sharedmem.time.time')
+    def test_refill(self, now):
+        for store in self.stores:
+            with self.subTest(store=type(store).__name__):
+                now.return_value = 1000.0
+                self.assertTrue(store.consume('refill', 1, 1)[0])
+                self.assertFalse(store.consume('refill', 1, 1)[0])
+                now.return_value = 1002.0
+                self.assertTrue(store.consume('refill', 1, 1)[0])
+
+    @mock.patch('foodgram.sharedmem.time.time')
+    def test_full_group_evicts_oldest_bucket(self, now):
+        store = MmapBuckets('test-collisions', slots=2, ways=2)
+        now.return_value = 1000.0
+        self.assertTrue(store.consume('first', 2, 1)[0])
+        now.return_value = 1000.5
+        self.assertTrue(store.consume('second', 2, 1)[0])
+        now.return_value = 1000.7
+        self.assertTrue(store.consume('third', 2, 1)[0])
+        self.assertTrue(store.consume('second', 2, 1)[0])
+        self.assertFalse(store.consume('second', 2, 1)[0])
+
+
+class ConcurrencyCounterTests(SharedMemoryTestCase):
+
+    def test_limit(self):
+        counters = MmapCounters('test-counters')
+        self.assertTrue(counters.acquire(1))
+        self.assertFalse(counters.acquire(1))
+        counters.release()
+        self.assertTrue(counters.acquire(1))
+        counters.release()
+
+    def test_no_free_slot_allows_requests(self):
+        counters = MmapCounters('test-full-counters', slots=1)
+        counters.open()
+        COUNTER.pack_into(counters.map, 0, os.getppid(), 5)
+        with self.assertLogs('foodgram.sharedmem', 'WARNING'):
+            self.assertTrue(counters.acquire(1))
+        counters.release()
+        self.assertEqual(counters.untracked, 0)
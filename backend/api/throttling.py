@@ -0,0 +1,33 @@
+from rest_framework.throttling import (AnonRateThrottle, ScopedRateThrottle,
+                                       SimpleRateThrottle, UserRateThrottle)
+
+from foodgram.sharedmem import get_bucket_store
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    wait_time = None
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        allowed, self.wait_time = get_bucket_store().consume(
+            key, self.num_requests, self.num_requests / self.duration)
+        return allowed
+
+    def wait(self):
+        return self.wait_time
+
+
+class AnonBucketThrottle(TokenBucketThrottle, AnonRateThrottle):
+    pass
+
+
+class UserBucketThrottle(TokenBucketThrottle, UserRateThrottle):
+    pass
+
+
+class EndpointBucketThrottle(ScopedRateThrottle, TokenBucketThrottle):
+    pass
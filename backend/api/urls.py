@@ -1,7 +1,10 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework import routers
 
-from api.views import IngredientViewSet, RecipeViewSet, TagViewSet
+from api.async_views import (FavoriteView, IngredientListView,
+                             ShoppingCartView, SubscribeView)
+from api.views import IngredientViewSet, RecipeViewSet, SyncView, TagViewSet
 from users.views import UserViewSet
 
 router = routers.DefaultRouter()
@@ -10,7 +13,18 @@ router.register('ingredients', IngredientViewSet, basename='ingredients')
 router.register('recipes', RecipeViewSet, basename='recipes')
 router.register('users', UserViewSet, basename='users')
 
-urlpatterns = [
+urlpatterns = []
+
+if settings.ASYNC_VIEWS:
+    urlpatterns += [
+        path('recipes/<int:pk>/favorite/', FavoriteView.as_view()),
+        path('recipes/<int:pk>/shopping_cart/', ShoppingCartView.as_view()),
+        path('users/<int:id>/subscribe/', SubscribeView.as_view()),
+        path('ingredients/', IngredientListView.as_view()),
+    ]
+
+urlpatterns += [
+    path('sync/', SyncView.as_view()),
     path('', include(router.urls)),
     path('auth/', include('djoser.urls')),
     path('auth/', include('djoser.urls.authtoken')),
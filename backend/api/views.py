@@ -1,21 +1,73 @@
+import re
+from functools import cached_property
+
+from django.conf import settings
 from django.db.models import Sum
 from django.http import HttpResponse
-from django.shortcuts import get_object_or_404, redirect
+from django.shortcuts import redirect
+from django.utils.cache import patch_vary_headers
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, serializers, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from api.conditional import conditional
 from api.filters import IngredientFilter, RecipeFilter
+from api.fragments import assemble_recipes
 from api.pagination import CustomPagination
 from api.permissions import AuthorOrReadOnly
 from api.serializers import (FavouriteAndShoppingCrtSerializer,
                              FavouriteSerializer, IngredientSerializer,
-                             RecipeReadSerializer, RecipeSerializer,
-                             ShoppingCartSerializer, TagSerializer)
+                             RecipeCoverageSerializer, RecipeReadSerializer,
+                             RecipeSerializer, ShoppingCartSerializer,
+                             TagSerializer)
+from recipes.catalog import get_catalog
+from recipes.changelog import get_changes
 from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from recipes.search import ingredient_index
+from recipes.versions import (POPULARITY_VERSION, PUBLIC_CONTENT_VERSION,
+                              get_versions)
+
+accepts_gzip = re.compile(r'\bgzip\b')
+RECIPE_COLUMNS = ('name', 'image', 'text', 'cooking_time')
+
+
+def parse_field_list(value):
+    return [field.strip() for field in value.split(',') if field.strip()]
+
+
+def get_selected_fields(query_params, available):
+    if 'fields' not in query_params and 'omit' not in query_params:
+        return None
+    selected = parse_field_list(query_params.get('fields', ''))
+    omitted = parse_field_list(query_params.get('omit', ''))
+    unknown = set(selected + omitted) - set(available)
+    if unknown:
+        raise serializers.ValidationError({
+            'fields': [f'Неизвестные поля: {", ".join(sorted(unknown))}.']})
+    return tuple(
+        field for field in available
+        if (not selected or field in selected) and field not in omitted
+    )
+
+
+def select_fields(data, fields):
+    if fields is None:
+        return data
+    return {field: data[field] for field in fields}
+
+
+def encoded_response(request, content, compressed):
+    if accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+        response = HttpResponse(compressed, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(content, content_type='application/json')
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
 
 
 class TagViewSet(viewsets.ReadOnlyModelViewSet):
@@ -23,6 +75,12 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = TagSerializer
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        catalog = get_catalog()
+        if request.accepted_renderer.format != 'json':
+            return Response(catalog.tags)
+        return encoded_response(request, catalog.tags_json, catalog.tags_gzip)
+
 
 class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
@@ -30,6 +88,17 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = (DjangoFilterBackend,)
     filterset_class = IngredientFilter
     pagination_class = None
+    throttle_scope = 'ingredients'
+
+    def list(self, request, *args, **kwargs):
+        catalog = get_catalog()
+        if 'name' in request.query_params:
+            return Response(
+                catalog.search_ingredients(request.query_params['name']))
+        if request.accepted_renderer.format != 'json':
+            return Response(catalog.ingredients)
+        return encoded_response(
+            request, catalog.ingredients_json, catalog.ingredients_gzip)
 
 
 class RecipeViewSet(viewsets.ModelViewSet):
@@ -38,12 +107,82 @@ class RecipeViewSet(viewsets.ModelViewSet):
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
     permission_classes = [AuthorOrReadOnly, IsAuthenticatedOrReadOnly]
+    throttle_scope = 'recipes'
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return RecipeReadSerializer
         return RecipeSerializer
 
+    @cached_property
+    def selected_fields(self):
+        return get_selected_fields(
+            self.request.query_params, RecipeReadSerializer.Meta.fields)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if (self.action not in ('list', 'retrieve')
+                or settings.FAST_READ_PATH):
+            return queryset
+        fields = self.selected_fields or RecipeReadSerializer.Meta.fields
+        if 'author' in fields:
+            queryset = queryset.select_related('author')
+        if 'tags' in fields:
+            queryset = queryset.prefetch_related('tags')
+        if 'ingredients' in fields:
+            queryset = queryset.prefetch_related(
+                'recipe_ingredients__ingredient')
+        return queryset.only(
+            'author', *(column for column in RECIPE_COLUMNS
+                        if column in fields))
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ('list', 'retrieve'):
+            context['fields'] = self.selected_fields
+        return context
+
+    def get_list_state(self, request, *args, **kwargs):
+        names = [PUBLIC_CONTENT_VERSION]
+        if 'ordering' in request.query_params:
+            names.append(POPULARITY_VERSION)
+        versions = get_versions(names)
+        return tuple(versions[name] for name in names)
+
+    def get_detail_state(self, request, *args, **kwargs):
+        try:
+            return (
+                Recipe.objects
+                .filter(pk=kwargs['pk'])
+                .values_list('updated_at', 'author__updated_at')
+                .first()
+            )
+        except ValueError:
+            return None
+
+    @conditional('get_list_state')
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_READ_PATH:
+            return super().list(request, *args, **kwargs)
+        page = self.paginate_queryset(
+            self.filter_queryset(self.get_queryset())
+            .values_list('id', 'author_id'))
+        return self.get_paginated_response([
+            select_fields(recipe, self.selected_fields)
+            for recipe in assemble_recipes(page, request)
+        ])
+
+    @conditional('get_detail_state')
+    def retrieve(self, request, *args, **kwargs):
+        if not settings.FAST_READ_PATH:
+            return super().retrieve(request, *args, **kwargs)
+        recipe = get_object_or_404(
+            self.get_queryset().values_list('id', 'author_id'),
+            pk=kwargs['pk'],
+        )
+        return Response(select_fields(
+            assemble_recipes([recipe], request)[0], self.selected_fields))
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
@@ -110,6 +249,54 @@ class RecipeViewSet(viewsets.ModelViewSet):
         short_link = recipe.short_link
         return Response({'short-link': short_link}, status=status.HTTP_200_OK)
 
+    @action(detail=True, methods=['get'], url_path='similar')
+    def similar(self, request, pk):
+        recipe = get_object_or_404(Recipe, pk=pk)
+        recipes = (
+            Recipe.objects
+            .filter(similar_to__recipe=recipe)
+            .order_by('-similar_to__score')
+        )
+        serializer = FavouriteAndShoppingCrtSerializer(
+            recipes, context={'request': request}, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='by_ingredients')
+    def by_ingredients(self, request):
+        try:
+            ingredient_ids = [
+                int(value) for value in request.query_params.getlist(
+                    'ingredients')
+            ]
+        except ValueError:
+            ingredient_ids = []
+        if not ingredient_ids:
+            return Response(
+                {'errors': 'Необходимо выбрать ингредиенты.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        page = self.paginate_queryset(
+            ingredient_index.search(ingredient_ids))
+        coverage = {
+            recipe_id: (covered, missing)
+            for recipe_id, covered, missing in page
+        }
+        recipes = (
+            Recipe.objects
+            .filter(id__in=coverage)
+            .select_related('author')
+            .prefetch_related('tags', 'recipe_ingredients__ingredient')
+            .in_bulk()
+        )
+        serializer = RecipeCoverageSerializer(
+            [recipes[recipe_id] for recipe_id in coverage
+             if recipe_id in recipes],
+            context={'request': request, 'coverage': coverage},
+            many=True,
+        )
+        return self.get_paginated_response(serializer.data)
+
     @action(
         detail=False, methods=['get'],
         url_path='download_shopping_cart',
@@ -149,3 +336,19 @@ class RecipeRedirectView(APIView):
         recipe = get_object_or_404(Recipe, pk=pk)
         full_link = recipe.full_link
         return redirect(full_link)
+
+
+class SyncView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        since = request.query_params.get('since')
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                since = -1
+            if since < 0:
+                raise serializers.ValidationError(
+                    {'since': ['Некорректный токен синхронизации.']})
+        return Response(get_changes(request.user, since))
@@ -0,0 +1,139 @@
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.backends.signals import connection_created
+
+REPLICA_LAG_QUERY = '''
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+'''
+
+WRITE_STATEMENT = re.compile(
+    r'\s*(?:INSERT|UPDATE|DELETE|MERGE|UPSERT|REPLACE|COPY|TRUNCATE'
+    r'|CREATE|ALTER|DROP|GRANT|REVOKE|LOCK)\b',
+    re.IGNORECASE,
+)
+
+read_alias = ContextVar('read_alias', default=None)
+request_writes = ContextVar('request_writes', default=None)
+
+
+def get_replica_lag(alias):
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(REPLICA_LAG_QUERY)
+        return float(cursor.fetchone()[0])
+
+
+class ReplicaPool:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.healthy = []
+        self.checked_at = None
+
+    def check(self):
+        healthy = []
+        for alias in settings.DATABASE_REPLICAS:
+            try:
+                lag = get_replica_lag(alias)
+            except DatabaseError:
+                connections[alias].close()
+                continue
+            if lag <= settings.REPLICA_MAX_LAG:
+                healthy.append(alias)
+        self.healthy = healthy
+        self.checked_at = time.monotonic()
+
+    def is_stale(self):
+        return (self.checked_at is None
+                or time.monotonic() - self.checked_at
+                > settings.REPLICA_CHECK_INTERVAL)
+
+    def choose(self):
+        if not settings.DATABASE_REPLICAS:
+            return None
+        if self.is_stale():
+            with self.lock:
+                if self.is_stale():
+                    self.check()
+        healthy = self.healthy
+        return random.choice(healthy) if healthy else None
+
+
+replica_pool = ReplicaPool()
+
+
+class RequestWrites:
+
+    def __init__(self):
+        self.wrote = False
+
+
+def track_writes(execute, sql, params, many, context):
+    writes = request_writes.get()
+    if writes is not None and WRITE_STATEMENT.match(sql):
+        writes.wrote = True
+    return execute(sql, params, many, context)
+
+
+def install_write_tracking(connection, **kwargs):
+    if (connection.alias == DEFAULT_DB_ALIAS
+            and track_writes not in connection.execute_wrappers):
+        connection.execute_wrappers.append(track_writes)
+
+
+connection_created.connect(install_write_tracking)
+
+
+@contextmanager
+def use_replica(alias):
+    writes = RequestWrites()
+    alias_token = read_alias.set(alias)
+    writes_token = request_writes.set(writes)
+    install_write_tracking(connections[DEFAULT_DB_ALIAS])
+    try:
+        yield writes
+    finally:
+        read_alias.reset(alias_token)
+        request_writes.reset(writes_token)
+
+
+@contextmanager
+def use_primary():
+    token = read_alias.set(None)
+    try:
+        yield
+    finally:
+        read_alias.reset(token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        alias = read_alias.get()
+        writes = request_writes.get()
+        if (alias is None or writes is not None and writes.wrote
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
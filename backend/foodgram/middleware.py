@@ -0,0 +1,231 @@
+import gzip
+import re
+from hashlib import md5
+from urllib.parse import urlencode
+
+import brotli
+from asgiref.sync import (iscoroutinefunction, markcoroutinefunction,
+                          sync_to_async)
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from rest_framework.permissions import SAFE_METHODS
+
+from foodgram.db_router import replica_pool, use_replica
+from foodgram.sharedmem import concurrency
+from recipes.versions import (CATALOG_VERSION, POPULARITY_VERSION,
+                              PUBLIC_AUTHORS_VERSION, PUBLIC_CONTENT_VERSION,
+                              get_versions, recipe_version)
+
+RECENT_WRITE_COOKIE = 'recent_write'
+CATALOG_PATHS = ('/api/tags/', '/api/ingredients/')
+RECIPE_LIST_PATH = '/api/recipes/'
+CACHED_HEADERS = ('Content-Type', 'Allow', 'Vary', 'ETag')
+BYPASS_HEADERS = (
+    'HTTP_ACCEPT_ENCODING', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE')
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 5
+recipe_detail_path = re.compile(r'/api/recipes/(\d+)/')
+accepts_brotli = re.compile(r'\bbr\b')
+accepts_gzip = re.compile(r'\bgzip\b')
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def choose_alias(self, request):
+        if (request.method in SAFE_METHODS
+                and RECENT_WRITE_COOKIE not in request.COOKIES):
+            return replica_pool.choose()
+        return None
+
+    def process_response(self, request, response, writes):
+        if request.method not in SAFE_METHODS or writes.wrote:
+            response.set_cookie(
+                RECENT_WRITE_COOKIE, '1',
+                max_age=settings.RECENT_WRITE_COOKIE_AGE,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with use_replica(self.choose_alias(request)) as writes:
+            return self.process_response(
+                request, self.get_response(request), writes)
+
+    async def __acall__(self, request):
+        if settings.DATABASE_REPLICAS and replica_pool.is_stale():
+            alias = await sync_to_async(self.choose_alias)(request)
+        else:
+            alias = self.choose_alias(request)
+        with use_replica(alias) as writes:
+            return self.process_response(
+                request, await self.get_response(request), writes)
+
+
+class CompressedCacheMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def get_version_names(self, request):
+        if request.path.startswith(CATALOG_PATHS):
+            return (CATALOG_VERSION,)
+        if request.path == RECIPE_LIST_PATH:
+            if 'ordering' in request.GET:
+                return (CATALOG_VERSION, PUBLIC_CONTENT_VERSION,
+                        POPULARITY_VERSION)
+            return (CATALOG_VERSION, PUBLIC_CONTENT_VERSION)
+        match = recipe_detail_path.fullmatch(request.path)
+        if match:
+            return (CATALOG_VERSION, recipe_version(int(match[1])),
+                    PUBLIC_AUTHORS_VERSION)
+        return None
+
+    def get_cache_key(self, request):
+        if (request.method not in ('GET', 'HEAD')
+                or 'HTTP_AUTHORIZATION' in request.META):
+            return None
+        names = self.get_version_names(request)
+        if names is None:
+            return None
+        versions = get_versions(names)
+        query = urlencode(sorted(
+            (key, value) for key in request.GET
+            for value in request.GET.getlist(key)))
+        accept = 'html' if 'text/html' in request.headers.get(
+            'Accept', '') else 'json'
+        digest = md5(
+            f'{request.get_host()}:{request.path}?{query}:{accept}'.encode()
+        ).hexdigest()
+        return ':'.join(
+            ['response', digest, *(str(versions[name]) for name in names)])
+
+    def bypass_headers(self, request):
+        return {
+            name: request.META.pop(name)
+            for name in BYPASS_HEADERS if name in request.META
+        }
+
+    def build_entry(self, response):
+        if (response.status_code != 200 or response.streaming
+                or response.has_header('Content-Encoding')
+                or response.has_header('Set-Cookie')
+                or not response.get('Content-Type', '').startswith(
+                    'application/json')):
+            return None
+        return {
+            'headers': [
+                (name, response[name])
+                for name in CACHED_HEADERS if response.has_header(name)
+            ],
+            'identity': response.content,
+            'gzip': gzip.compress(response.content, GZIP_LEVEL),
+            'br': brotli.compress(response.content, quality=BROTLI_QUALITY),
+        }
+
+    def respond(self, request, entry):
+        headers = dict(entry['headers'])
+        conditional = get_conditional_response(
+            request, etag=headers.get('ETag'))
+        if conditional is not None:
+            return conditional
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if accepts_brotli.search(accept_encoding):
+            encoding = 'br'
+        elif accepts_gzip.search(accept_encoding):
+            encoding = 'gzip'
+        else:
+            encoding = 'identity'
+        response = HttpResponse(entry[encoding])
+        for name, value in headers.items():
+            response[name] = value
+        if encoding != 'identity':
+            response['Content-Encoding'] = encoding
+        response['Content-Length'] = len(entry[encoding])
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        key = self.get_cache_key(request)
+        if key is None:
+            return self.get_response(request)
+        entry = cache.get(key)
+        if entry is None:
+            bypassed = self.bypass_headers(request)
+            response = self.get_response(request)
+            request.META.update(bypassed)
+            entry = self.build_entry(response)
+            if entry is None:
+                return response
+            cache.set(key, entry, settings.RESPONSE_CACHE_TIMEOUT)
+        return self.respond(request, entry)
+
+    async def __acall__(self, request):
+        key = await sync_to_async(self.get_cache_key)(request)
+        if key is None:
+            return await self.get_response(request)
+        entry = await cache.aget(key)
+        if entry is None:
+            bypassed = self.bypass_headers(request)
+            response = await self.get_response(request)
+            request.META.update(bypassed)
+            entry = await sync_to_async(self.build_entry)(response)
+            if entry is None:
+                return response
+            await cache.aset(key, entry, settings.RESPONSE_CACHE_TIMEOUT)
+        return self.respond(request, entry)
+
+
+class ConcurrencyLimitMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def overloaded_response(self):
+        response = HttpResponse(
+            'Сервис перегружен, повторите запрос позже.',
+            status=503, content_type='text/plain; charset=utf-8')
+        response['Retry-After'] = str(settings.CONCURRENCY_RETRY_AFTER)
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.CONCURRENCY_LIMIT:
+            return self.get_response(request)
+        if not concurrency.acquire(settings.CONCURRENCY_LIMIT):
+            return self.overloaded_response()
+        try:
+            return self.get_response(request)
+        finally:
+            concurrency.release()
+
+    async def __acall__(self, request):
+        if not settings.CONCURRENCY_LIMIT:
+            return await self.get_response(request)
+        if not concurrency.acquire(settings.CONCURRENCY_LIMIT):
+            return self.overloaded_response()
+        try:
+            return await self.get_response(request)
+        finally:
+            concurrency.release()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -36,7 +37,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'foodgram.middleware.ConcurrencyLimitMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'foodgram.middleware.ReplicaMiddleware',
+    'foodgram.middleware.CompressedCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -65,6 +69,8 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'foodgram.wsgi.application'
 
+ASGI = os.getenv('GUNICORN_APP', 'foodgram.wsgi').startswith('foodgram.asgi')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -72,7 +78,38 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', 'django_user'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', 'localhost'),
-        'PORT': os.getenv('DB_PORT', '5432')
+        'PORT': os.getenv('DB_PORT', '5432'),
+        'CONN_MAX_AGE': (
+            0 if ASGI else int(os.getenv('DB_CONN_MAX_AGE', '60'))),
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+for number, host in enumerate(
+        filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), 1):
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+DATABASE_ROUTERS = ['foodgram.db_router.ReplicaRouter']
+
+REPLICA_MAX_LAG = float(os.getenv('REPLICA_MAX_LAG', '5'))
+
+REPLICA_CHECK_INTERVAL = float(os.getenv('REPLICA_CHECK_INTERVAL', '5'))
+
+RECENT_WRITE_COOKIE_AGE = int(os.getenv('RECENT_WRITE_COOKIE_AGE', '10'))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
     }
 }
 
@@ -111,6 +148,15 @@ STATIC_ROOT = BASE_DIR / 'collected_static'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+STORAGES = {
+    'default': {
+        'BACKEND': 'recipes.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -126,10 +172,44 @@ DJOSER = {
     'HIDE_USERS': False,
 }
 
+FAST_READ_PATH = os.getenv('FAST_READ_PATH', 'False') == 'True'
+
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False') == 'True'
+
+TOKEN_SHARED_CACHE = os.getenv('TOKEN_SHARED_CACHE', 'True') == 'True'
+
+THROTTLE_STORE = os.getenv('THROTTLE_STORE', 'mmap')
+SHARED_MEMORY_DIR = os.getenv(
+    'SHARED_MEMORY_DIR',
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir())
+CONCURRENCY_LIMIT = int(os.getenv('CONCURRENCY_LIMIT', '0'))
+CONCURRENCY_RETRY_AFTER = int(os.getenv('CONCURRENCY_RETRY_AFTER', '1'))
+
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', '300'))
+
+SNAPSHOT_ROOT = os.getenv('SNAPSHOT_ROOT', '')
+SNAPSHOT_BASE_URL = os.getenv('SNAPSHOT_BASE_URL', 'http://localhost/')
+
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
+    ),
+    'DEFAULT_THROTTLE_CLASSES': (
+        'api.throttling.AnonBucketThrottle',
+        'api.throttling.UserBucketThrottle',
+        'api.throttling.EndpointBucketThrottle',
     ),
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '1')),
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': os.getenv('THROTTLE_ANON_RATE', '120/min'),
+        'user': os.getenv('THROTTLE_USER_RATE', '600/min'),
+        'ingredients': os.getenv('THROTTLE_INGREDIENTS_RATE', '60/min'),
+        'recipes': os.getenv('THROTTLE_RECIPES_RATE', '300/min'),
+    },
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
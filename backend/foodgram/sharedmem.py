@@ -0,0 +1,218 @@
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from hashlib import blake2b
+
+from django.conf import settings
+from django.core.cache import cache
+
+BUCKET = struct.Struct('<Qddd')
+BUCKET_SLOTS = 65536
+BUCKET_WAYS = 8
+COUNTER = struct.Struct('<qq')
+COUNTER_SLOTS = 256
+
+logger = logging.getLogger(__name__)
+
+
+def key_hash(key):
+    return int.from_bytes(
+        blake2b(key.encode(), digest_size=8).digest(), 'little') | 1
+
+
+def refill(tokens, updated, now, capacity, rate):
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+class SharedFile:
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self.lock = threading.Lock()
+        self.pid = None
+
+    def open(self):
+        if self.pid == os.getpid():
+            return
+        path = os.path.join(settings.SHARED_MEMORY_DIR, self.name)
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self.fd).st_size < self.size:
+            os.ftruncate(self.fd, self.size)
+        self.map = mmap.mmap(self.fd, self.size)
+        self.pid = os.getpid()
+
+    def lock_range(self, offset, length):
+        fcntl.lockf(self.fd, fcntl.LOCK_EX, length, offset)
+
+    def unlock_range(self, offset, length):
+        fcntl.lockf(self.fd, fcntl.LOCK_UN, length, offset)
+
+
+class MmapBuckets(SharedFile):
+
+    def __init__(self, name, slots=BUCKET_SLOTS, ways=BUCKET_WAYS):
+        super().__init__(name, slots * BUCKET.size)
+        self.ways = ways
+        self.groups = slots // ways
+
+    def find_slot(self, offset, hashed, now):
+        free = oldest = None
+        oldest_updated = now
+        for way in range(self.ways):
+            slot = offset + way * BUCKET.size
+            stored, tokens, updated, full_at = BUCKET.unpack_from(
+                self.map, slot)
+            if stored == hashed:
+                return slot, tokens, updated
+            if free is None and (not stored or full_at <= now):
+                free = slot
+            if updated <= oldest_updated:
+                oldest, oldest_updated = slot, updated
+        return free if free is not None else oldest, None, None
+
+    def consume(self, key, capacity, rate):
+        hashed = key_hash(key)
+        offset = hashed % self.groups * self.ways * BUCKET.size
+        length = self.ways * BUCKET.size
+        with self.lock:
+            self.open()
+            self.lock_range(offset, length)
+            try:
+                now = time.time()
+                slot, tokens, updated = self.find_slot(offset, hashed, now)
+                if tokens is None:
+                    tokens, updated = capacity, now
+                tokens = refill(tokens, updated, now, capacity, rate)
+                allowed = tokens >= 1
+                if allowed:
+                    tokens -= 1
+                BUCKET.pack_into(
+                    self.map, slot, hashed, tokens, now,
+                    now + (capacity - tokens) / rate)
+            finally:
+                self.unlock_range(offset, length)
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+
+class CacheBuckets:
+
+    def incr(self, key, timeout):
+        cache.add(key, 0, timeout)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout)
+            return 1
+
+    def consume(self, key, capacity, rate):
+        period = capacity / rate
+        now = time.time()
+        window = int(now // period)
+        elapsed = now - window * period
+        current_key = f'throttle_bucket:{key}:{window}'
+        count = self.incr(current_key, int(period * 2) + 1)
+        previous = cache.get(f'throttle_bucket:{key}:{window - 1}', 0)
+        excess = previous * (1 - elapsed / period) + count - capacity
+        if excess <= 0:
+            return True, 0
+        try:
+            cache.decr(current_key)
+        except ValueError:
+            pass
+        wait = period - elapsed
+        if previous:
+            wait = min(wait, excess * period / previous)
+        return False, wait
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MmapCounters(SharedFile):
+
+    def __init__(self, name, slots=COUNTER_SLOTS):
+        super().__init__(name, slots * COUNTER.size)
+        self.slots = slots
+        self.offset = None
+        self.inflight = 0
+        self.untracked = 0
+        self.warned = None
+
+    def claim(self):
+        if self.offset is not None and self.owner == self.pid:
+            return True
+        self.offset = None
+        free = None
+        for slot in range(self.slots):
+            offset = slot * COUNTER.size
+            pid, _ = COUNTER.unpack_from(self.map, offset)
+            if pid and pid != self.pid and not is_alive(pid):
+                COUNTER.pack_into(self.map, offset, 0, 0)
+                pid = 0
+            if pid == self.pid or (not pid and free is None):
+                free = offset
+        if free is None:
+            if self.warned != self.pid:
+                self.warned = self.pid
+                logger.warning(
+                    'Нет свободных слотов для счётчиков, запросы не '
+                    'ограничиваются.')
+            return False
+        self.offset, self.owner, self.inflight = free, self.pid, 0
+        COUNTER.pack_into(self.map, free, self.pid, 0)
+        return True
+
+    def total(self):
+        total = 0
+        for pid, inflight in COUNTER.iter_unpack(self.map):
+            if inflight > 0 and (pid == self.pid or is_alive(pid)):
+                total += inflight
+        return total
+
+    def acquire(self, limit):
+        with self.lock:
+            self.open()
+            self.lock_range(0, self.size)
+            try:
+                if not self.claim():
+                    self.untracked += 1
+                    return True
+                if self.total() >= limit:
+                    return False
+                self.inflight += 1
+                COUNTER.pack_into(
+                    self.map, self.offset, self.pid, self.inflight)
+                return True
+            finally:
+                self.unlock_range(0, self.size)
+
+    def release(self):
+        with self.lock:
+            if self.untracked:
+                self.untracked -= 1
+                return
+            self.inflight -= 1
+            COUNTER.pack_into(self.map, self.offset, self.pid, self.inflight)
+
+
+def get_bucket_store():
+    if settings.THROTTLE_STORE == 'cache':
+        return cache_buckets
+    return mmap_buckets
+
+
+mmap_buckets = MmapBuckets('foodgram-buckets')
+cache_buckets = CacheBuckets()
+concurrency = MmapCounters('foodgram-concurrency')
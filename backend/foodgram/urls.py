@@ -1,13 +1,20 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
 
+from api.async_views import AsyncRecipeRedirectView
 from api.views import RecipeRedirectView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
-    path('r/<int:pk>/', RecipeRedirectView.as_view(), name='redirect'),
+    path(
+        'r/<int:pk>/',
+        (AsyncRecipeRedirectView if settings.ASYNC_VIEWS
+         else RecipeRedirectView).as_view(),
+        name='redirect'
+    ),
     path(
         'redoc/',
         TemplateView.as_view(template_name='redoc.html'),
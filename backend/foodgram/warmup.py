@@ -0,0 +1,26 @@
+from django.db import DatabaseError, connections
+from django.urls import get_resolver
+
+from api.serializers import (RecipeReadSerializer, RecipeSerializer,
+                             SubscribingSerializer)
+from recipes.catalog import get_catalog
+from recipes.search import ingredient_index
+
+WARM_UP_SERIALIZERS = (
+    RecipeReadSerializer,
+    RecipeSerializer,
+    SubscribingSerializer,
+)
+
+
+def warm_up():
+    for serializer_class in WARM_UP_SERIALIZERS:
+        serializer_class().fields
+    get_resolver().reverse_dict
+    try:
+        get_catalog()
+        ingredient_index.refresh()
+    except DatabaseError:
+        pass
+    finally:
+        connections.close_all()
@@ -0,0 +1,16 @@
+import multiprocessing
+import os
+
+bind = '0.0.0.0:9000'
+wsgi_app = os.getenv('GUNICORN_APP', 'foodgram.wsgi')
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+workers = int(os.getenv(
+    'GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', '1'))
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = max_requests // 10
+
+
+def post_worker_init(worker):
+    from foodgram.warmup import warm_up
+    warm_up()
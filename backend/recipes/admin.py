@@ -1,18 +1,62 @@
 from django.contrib import admin
+from django.db.models import Exists, OuterRef
 
-from recipes.models import Ingredient, Recipe, Tag
+from recipes.models import Ingredient, Recipe, RecipeIngredient, RecipeTag, Tag
+from recipes.paginators import EstimatedCountPaginator
+
+
+class TagFilter(admin.SimpleListFilter):
+    title = 'Теги'
+    parameter_name = 'tag'
+
+    def lookups(self, request, model_admin):
+        return Tag.objects.values_list('slug', 'name')
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        return queryset.filter(Exists(RecipeTag.objects.filter(
+            recipe=OuterRef('pk'), tag__slug=self.value())))
+
+
+class RecipeIngredientInline(admin.TabularInline):
+    model = RecipeIngredient
+    autocomplete_fields = ('ingredient',)
+    min_num = 1
+    extra = 0
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'recipe', 'ingredient')
+
+
+class RecipeTagInline(admin.TabularInline):
+    model = RecipeTag
+    min_num = 1
+    extra = 0
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('recipe', 'tag')
 
 
 class RecipeAdmin(admin.ModelAdmin):
-    list_display = ('name', 'author',)
-    search_fields = ('author', 'name',)
-    list_filter = ('tags',)
+    list_display = ('name', 'author', 'favorites_count',)
+    list_select_related = ('author',)
+    search_fields = ('name', 'author__username', 'author__email',)
+    list_filter = (TagFilter,)
+    autocomplete_fields = ('author',)
+    readonly_fields = ('favorites_count', 'trending_score',)
+    inlines = (RecipeIngredientInline, RecipeTagInline,)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = '-отсутствует-'
 
 
 class IngredientAdmin(admin.ModelAdmin):
     list_display = ('name', 'measurement_unit',)
     search_fields = ('name',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = '-отсутствует-'
 
 
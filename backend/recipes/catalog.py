@@ -0,0 +1,55 @@
+import gzip
+import threading
+
+from api.renderers import ORJSONRenderer
+from foodgram.db_router import use_primary
+from recipes.models import Ingredient, Tag
+from recipes.versions import CATALOG_VERSION, get_version
+
+
+class Catalog:
+
+    def __init__(self, version):
+        self.version = version
+        self.tags = tuple(Tag.objects.values('id', 'name', 'slug'))
+        self.ingredients = tuple(
+            Ingredient.objects.values('id', 'name', 'measurement_unit'))
+        self.tag_ids = {tag['slug']: tag['id'] for tag in self.tags}
+        self.ingredient_names = tuple(
+            ingredient['name'].lower() for ingredient in self.ingredients)
+        self.tags_json = ORJSONRenderer().render(self.tags)
+        self.tags_gzip = gzip.compress(self.tags_json)
+        self.ingredients_json = ORJSONRenderer().render(self.ingredients)
+        self.ingredients_gzip = gzip.compress(self.ingredients_json)
+
+    def search_ingredients(self, name):
+        name = name.lower()
+        return [
+            ingredient for ingredient, ingredient_name in zip(
+                self.ingredients, self.ingredient_names)
+            if name in ingredient_name
+        ]
+
+
+_lock = threading.Lock()
+_catalog = None
+
+
+def get_catalog():
+    global _catalog
+    version = get_version(CATALOG_VERSION)
+    if _catalog is None or _catalog.version != version:
+        with _lock:
+            if _catalog is None or _catalog.version != version:
+                with use_primary():
+                    _catalog = Catalog(version)
+    return _catalog
+
+
+def get_tag_choices():
+    return [(slug, slug) for slug in get_catalog().tag_ids]
+
+
+def get_tag_ids(slugs):
+    tag_ids = get_catalog().tag_ids
+    return [tag_ids[slug] for slug in slugs if slug in tag_ids]
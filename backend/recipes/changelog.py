@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from django.db.models import Min
+from django.utils import timezone
+
+from foodgram.db_router import use_primary
+from recipes.constants import CHANGELOG_SETTLE_SECONDS, CHANGELOG_SYNC_LIMIT
+from recipes.membership import Membership, get_membership
+from recipes.models import ChangeLog
+from users.models import Subscription
+
+USER_KINDS = {
+    ChangeLog.FAVORITE: 'favorites',
+    ChangeLog.SHOPPING_CART: 'shopping_cart',
+    ChangeLog.SUBSCRIPTION: 'subscriptions',
+}
+
+
+def log_change(kind, action, object_id, user_id=None):
+    ChangeLog.objects.create(
+        user_id=user_id, kind=kind, action=action, object_id=object_id)
+
+
+def get_sync_token():
+    settled = timezone.now() - timedelta(seconds=CHANGELOG_SETTLE_SECONDS)
+    return (
+        ChangeLog.objects
+        .filter(created_at__lt=settled)
+        .order_by('-id')
+        .values_list('id', flat=True)
+        .first()
+    ) or 0
+
+
+def is_valid_token(since, token):
+    if since > token:
+        return False
+    first = ChangeLog.objects.aggregate(first=Min('id'))['first']
+    return first is None or since >= first - 1
+
+
+def get_snapshot(user, token):
+    membership = Membership.load(user.pk)
+    with use_primary():
+        subscriptions = list(
+            Subscription.objects.filter(user=user)
+            .order_by('subscribing_id')
+            .values_list('subscribing_id', flat=True))
+    return {
+        'token': token,
+        'reset': True,
+        'favorites': {
+            'added': membership.favorited.tolist(), 'removed': []},
+        'shopping_cart': {
+            'added': membership.in_shopping_cart.tolist(), 'removed': []},
+        'subscriptions': {'added': subscriptions, 'removed': []},
+        'recipes': {'changed': [], 'removed': []},
+    }
+
+
+def get_changes(user, since):
+    token = get_sync_token()
+    if since is None or not is_valid_token(since, token):
+        return get_snapshot(user, token)
+    entries = list(
+        ChangeLog.objects
+        .filter(user=user, id__gt=since)
+        .order_by('id')
+        .values_list('kind', 'action', 'object_id')[:CHANGELOG_SYNC_LIMIT + 1]
+    )
+    if len(entries) > CHANGELOG_SYNC_LIMIT:
+        return get_snapshot(user, token)
+    membership = get_membership(user)
+    entries += (
+        ChangeLog.objects
+        .filter(
+            user=None, kind=ChangeLog.RECIPE, id__gt=since,
+            object_id__in={
+                *membership.favorited.tolist(),
+                *membership.in_shopping_cart.tolist(),
+            },
+        )
+        .order_by('id')
+        .values_list('kind', 'action', 'object_id')
+    )
+    latest = {}
+    for kind, action, object_id in entries:
+        latest[kind, object_id] = action
+    changes = {
+        'token': token,
+        'reset': False,
+        **{name: {'added': [], 'removed': []}
+           for name in USER_KINDS.values()},
+        'recipes': {'changed': [], 'removed': []},
+    }
+    for (kind, object_id), action in sorted(latest.items()):
+        if kind == ChangeLog.RECIPE:
+            changes['recipes'][
+                'removed' if action == ChangeLog.REMOVE else 'changed'
+            ].append(object_id)
+        else:
+            changes[USER_KINDS[kind]][
+                'added' if action == ChangeLog.ADD else 'removed'
+            ].append(object_id)
+    return changes
@@ -5,3 +5,41 @@ RECIPE_NAME_LENGTH = 256
 SHORT_LINK_LENGTH = 10
 MIN = 1
 MAX = 1000
+FEED_FANOUT_LIMIT = 10000
+FEED_BACKFILL_SIZE = 100
+FEED_BATCH_SIZE = 1000
+VERSION_TIMEOUT = None
+INDEX_CHANGES_LIMIT = 1000
+INDEX_CHANGE_TIMEOUT = 60 * 60
+INDEX_BATCH_SIZE = 5000
+SIMILAR_RECIPES_COUNT = 10
+SIMILARITY_BATCH_SIZE = 1000
+SIMILARITY_MAX_DF = 0.05
+SIMILARITY_MIN_DF_LIMIT = 100
+SIMILARITY_BLOCK_PRODUCTS = 10 ** 7
+FAVORITE_WEIGHT = 2
+SHOPPING_CART_WEIGHT = 1
+TRENDING_HALF_LIFE_HOURS = 24
+TRENDING_WINDOW_DAYS = 7
+TRENDING_BATCH_SIZE = 1000
+RECIPE_FRAGMENT_TIMEOUT = 60 * 60 * 24
+ESTIMATED_COUNT_THRESHOLD = 100000
+EXPORT_CHUNK_SIZE = 2000
+FAKE_DATA_BATCH_SIZE = 10000
+FAKE_DATA_PASSWORD = 'password'
+FAKE_DATA_ZIPF = 1.3
+IMPORT_BATCH_SIZE = 1000
+IMPORT_SOURCE_LENGTH = 255
+MEDIA_NAME_LENGTH = 255
+GC_MEDIA_BATCH_SIZE = 5000
+GC_MEDIA_GRACE_HOURS = 24
+MEDIA_DELETE_GRACE_SECONDS = 60 * 5
+MEMBERSHIP_TIMEOUT = 60 * 60 * 24
+MEMBERSHIP_LOCAL_SIZE = 10000
+CHANGE_KIND_LENGTH = 16
+CHANGE_ACTION_LENGTH = 8
+CHANGELOG_RETENTION_DAYS = 30
+CHANGELOG_SETTLE_SECONDS = 5
+CHANGELOG_SYNC_LIMIT = 5000
+SNAPSHOT_BATCH_SIZE = 500
+SNAPSHOT_OVERLAP_SECONDS = 60
@@ -0,0 +1,89 @@
+from itertools import islice
+
+from django.db.models import F
+
+from recipes.constants import (FEED_BACKFILL_SIZE, FEED_BATCH_SIZE,
+                               FEED_FANOUT_LIMIT)
+from recipes.models import FeedEntry, Recipe
+from users.models import Subscription, User
+
+
+def is_fanout_author(author_id):
+    return not User.objects.filter(
+        pk=author_id, is_pull_author=True).exists()
+
+
+def add_follower(author_id):
+    User.objects.filter(pk=author_id).update(
+        followers_count=F('followers_count') + 1)
+    User.objects.filter(
+        pk=author_id,
+        is_pull_author=False,
+        followers_count__gt=FEED_FANOUT_LIMIT,
+    ).update(is_pull_author=True)
+
+
+def remove_follower(author_id):
+    User.objects.filter(pk=author_id, followers_count__gt=0).update(
+        followers_count=F('followers_count') - 1)
+
+
+def fan_out_recipe(recipe_id, author_id):
+    fan_out_recipes([recipe_id], author_id)
+
+
+def fan_out_recipes(recipe_ids, author_id):
+    if not is_fanout_author(author_id):
+        return
+    followers = (
+        Subscription.objects
+        .filter(subscribing_id=author_id)
+        .values_list('user_id', flat=True)
+        .iterator(chunk_size=FEED_BATCH_SIZE)
+    )
+    while batch := list(islice(followers, FEED_BATCH_SIZE)):
+        FeedEntry.objects.bulk_create(
+            (FeedEntry(user_id=user_id, recipe_id=recipe_id,
+                       author_id=author_id)
+             for user_id in batch for recipe_id in recipe_ids),
+            batch_size=FEED_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+
+def backfill_author(user_id, author_id):
+    if not is_fanout_author(author_id):
+        return
+    recipe_ids = (
+        Recipe.objects
+        .filter(author_id=author_id)
+        .values_list('id', flat=True)[:FEED_BACKFILL_SIZE]
+    )
+    FeedEntry.objects.bulk_create(
+        (FeedEntry(user_id=user_id, recipe_id=recipe_id,
+                   author_id=author_id) for recipe_id in recipe_ids),
+        ignore_conflicts=True,
+    )
+
+
+def remove_author(user_id, author_id):
+    FeedEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def get_pull_authors(user_id):
+    return list(
+        Subscription.objects
+        .filter(user_id=user_id, subscribing__is_pull_author=True)
+        .values_list('subscribing_id', flat=True)
+    )
+
+
+def get_feed(user_id, limit, before=None):
+    entries = FeedEntry.objects.filter(user_id=user_id)
+    pulled = Recipe.objects.filter(author_id__in=get_pull_authors(user_id))
+    if before is not None:
+        entries = entries.filter(recipe_id__lt=before)
+        pulled = pulled.filter(id__lt=before)
+    recipe_ids = set(entries.values_list('recipe_id', flat=True)[:limit])
+    recipe_ids.update(pulled.values_list('id', flat=True)[:limit])
+    return sorted(recipe_ids, reverse=True)[:limit]
@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, Max, OuterRef
+from django.utils import timezone
+
+from recipes.constants import CHANGELOG_RETENTION_DAYS
+from recipes.models import ChangeLog
+
+
+class Command(BaseCommand):
+
+    help = 'Сжимает журнал изменений для синхронизации клиентов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=CHANGELOG_RETENTION_DAYS,
+            help='Сколько дней хранить записи журнала.')
+
+    def handle(self, *args, **options):
+        newer = ChangeLog.objects.filter(
+            kind=OuterRef('kind'),
+            object_id=OuterRef('object_id'),
+            id__gt=OuterRef('id'),
+        )
+        superseded, _ = ChangeLog.objects.filter(
+            user__isnull=False
+        ).filter(
+            Exists(newer.filter(user=OuterRef('user')))
+        ).delete()
+        superseded += ChangeLog.objects.filter(
+            user__isnull=True
+        ).filter(
+            Exists(newer.filter(user__isnull=True))
+        ).delete()[0]
+
+        last = ChangeLog.objects.aggregate(last=Max('id'))['last']
+        expired, _ = ChangeLog.objects.filter(
+            created_at__lt=timezone.now() - timedelta(days=options['days']),
+            id__lt=last or 0,
+        ).delete()
+        self.stdout.write(
+            f'Удалено повторных записей: {superseded}. '
+            f'Удалено устаревших записей: {expired}.')
@@ -0,0 +1,147 @@
+from array import array
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from scipy import sparse
+
+from recipes.constants import (SIMILAR_RECIPES_COUNT, SIMILARITY_BATCH_SIZE,
+                               SIMILARITY_BLOCK_PRODUCTS, SIMILARITY_MAX_DF,
+                               SIMILARITY_MIN_DF_LIMIT)
+from recipes.models import (Ingredient, Recipe, RecipeIngredient, RecipeTag,
+                            SimilarRecipe)
+
+
+class Command(BaseCommand):
+
+    help = 'Рассчитывает похожие рецепты по ингредиентам и тегам'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Пересчитать все рецепты, а не только изменённые.')
+        parser.add_argument(
+            '--top-k', type=int, default=SIMILAR_RECIPES_COUNT,
+            help='Количество похожих рецептов для каждого рецепта.')
+        parser.add_argument(
+            '--batch-size', type=int, default=SIMILARITY_BATCH_SIZE,
+            help='Количество рецептов, обрабатываемых за один проход.')
+        parser.add_argument(
+            '--max-df', type=float, default=SIMILARITY_MAX_DF,
+            help='Не учитывать ингредиенты и теги, которые встречаются '
+                 'в большей доле рецептов.')
+
+    def handle(self, *args, **options):
+        started = timezone.now()
+        self.top_k = options['top_k']
+        self.recipe_ids = np.fromiter(
+            Recipe.objects.order_by('id').values_list('id', flat=True)
+            .iterator(), dtype=np.int64)
+        self.matrix = self.build_matrix(options['max_df'])
+
+        last_run = SimilarRecipe.objects.aggregate(
+            last_run=Max('computed_at'))['last_run']
+        if options['full'] or last_run is None:
+            changed = set(self.recipe_ids.tolist())
+            affected = set()
+        else:
+            changed = set(
+                Recipe.objects.filter(updated_at__gte=last_run)
+                .values_list('id', flat=True))
+            affected = set(
+                SimilarRecipe.objects.filter(similar_id__in=changed)
+                .values_list('recipe_id', flat=True))
+
+        neighbours = self.update(changed, started, options['batch_size'])
+        rest = (affected | neighbours) - changed
+        self.update(rest, started, options['batch_size'])
+        self.stdout.write(
+            f'Пересчитано рецептов: {len(changed) + len(rest)}.')
+
+    def build_matrix(self, max_df):
+        tag_offset = (Ingredient.objects.aggregate(Max('id'))['id__max']
+                      or 0) + 1
+        rows, columns = array('q'), array('q')
+        for recipe_id, ingredient_id in (
+                RecipeIngredient.objects.order_by()
+                .values_list('recipe_id', 'ingredient_id').iterator()):
+            rows.append(recipe_id)
+            columns.append(ingredient_id)
+        for recipe_id, tag_id in (
+                RecipeTag.objects.order_by()
+                .values_list('recipe_id', 'tag_id').iterator()):
+            rows.append(recipe_id)
+            columns.append(tag_offset + tag_id)
+
+        rows = np.frombuffer(rows, np.int64)
+        columns = np.frombuffer(columns, np.int64)
+        known = np.isin(rows, self.recipe_ids)
+        rows = np.searchsorted(self.recipe_ids, rows[known])
+        columns = columns[known]
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, columns)),
+            shape=(len(self.recipe_ids), int(columns.max(initial=0)) + 1),
+        )
+        matrix.data[:] = 1
+        frequency = matrix.getnnz(axis=0)
+        weights = np.log((1 + len(self.recipe_ids)) / (1 + frequency)) + 1
+        weights[frequency > max(
+            max_df * len(self.recipe_ids), SIMILARITY_MIN_DF_LIMIT)] = 0
+        matrix = matrix.dot(sparse.diags(weights.astype(np.float32))).tocsr()
+        matrix.eliminate_zeros()
+        self.costs = (matrix > 0).dot(frequency)
+        norms = np.sqrt(matrix.multiply(matrix).sum(axis=1)).A1
+        norms[norms == 0] = 1
+        return sparse.diags(1 / norms).dot(matrix).tocsr()
+
+    def score_blocks(self, batch):
+        start = 0
+        while start < len(batch):
+            end = start + max(1, int(np.searchsorted(
+                np.cumsum(self.costs[batch[start:]]),
+                SIMILARITY_BLOCK_PRODUCTS, side='right')))
+            block = batch[start:end]
+            yield block, self.matrix[block].dot(self.matrix.T).tocsr()
+            start = end
+
+    def update(self, recipe_ids, started, batch_size):
+        recipe_ids = np.fromiter(recipe_ids, dtype=np.int64)
+        positions = np.searchsorted(
+            self.recipe_ids,
+            recipe_ids[np.isin(recipe_ids, self.recipe_ids)],
+        )
+        neighbours = set()
+        for start in range(0, len(positions), batch_size):
+            batch = positions[start:start + batch_size]
+            similar = []
+            for block, scores in self.score_blocks(batch):
+                for row, position in enumerate(block):
+                    similar.extend(self.get_similar(
+                        scores, row, position, started, neighbours))
+            with transaction.atomic():
+                SimilarRecipe.objects.filter(
+                    recipe_id__in=self.recipe_ids[batch].tolist()).delete()
+                SimilarRecipe.objects.bulk_create(similar)
+        return neighbours
+
+    def get_similar(self, scores, row, position, started, neighbours):
+        begin, end = scores.indptr[row], scores.indptr[row + 1]
+        columns = scores.indices[begin:end]
+        values = scores.data[begin:end]
+        keep = columns != position
+        columns, values = columns[keep], values[keep]
+        if len(values) > self.top_k:
+            top = np.argpartition(-values, self.top_k)[:self.top_k]
+            columns, values = columns[top], values[top]
+        recipe_id = int(self.recipe_ids[position])
+        for column, value in zip(columns, values):
+            similar_id = int(self.recipe_ids[column])
+            neighbours.add(similar_id)
+            yield SimilarRecipe(
+                recipe_id=recipe_id,
+                similar_id=similar_id,
+                score=float(value),
+                computed_at=started,
+            )
@@ -0,0 +1,204 @@
+import csv
+import gzip
+import io
+import os
+
+import orjson
+from django.core.management.base import BaseCommand
+
+from recipes.constants import EXPORT_CHUNK_SIZE
+from recipes.models import Favourite, Recipe
+from users.models import Subscription
+
+RECIPE_FIELDS = (
+    'id', 'name', 'text', 'cooking_time', 'image', 'short_link',
+    'favorites_count', 'updated_at', 'author_id', 'author_username',
+    'author_email', 'tags', 'ingredients',
+)
+FAVOURITE_FIELDS = ('id', 'user_id', 'recipe_id')
+SUBSCRIPTION_FIELDS = ('id', 'user_id', 'subscribing_id')
+
+
+class ShardWriter:
+
+    def __init__(self, directory, name, file_format, fields, compress,
+                 shard_size):
+        self.directory = directory
+        self.name = name
+        self.file_format = file_format
+        self.fields = fields
+        self.compress = compress
+        self.shard_size = shard_size
+        self.shard = 0
+        self.rows = 0
+        self.total = 0
+        self.file = None
+        self.paths = []
+
+    def get_path(self):
+        name = self.name
+        if self.shard_size:
+            name = f'{name}-{self.shard:05d}'
+        name = f'{name}.{self.file_format}'
+        if self.compress:
+            name = f'{name}.gz'
+        return os.path.join(self.directory, name)
+
+    def open(self):
+        self.path = self.get_path()
+        self.file = open(f'{self.path}.tmp', 'wb')
+        self.stream = (
+            gzip.GzipFile(fileobj=self.file, mode='wb')
+            if self.compress else self.file
+        )
+        if self.file_format == 'csv':
+            self.text = io.TextIOWrapper(
+                self.stream, encoding='utf-8', newline='')
+            self.writer = csv.DictWriter(self.text, fieldnames=self.fields)
+            self.writer.writeheader()
+        self.rows = 0
+
+    def flush(self):
+        if self.file_format == 'csv':
+            self.text.flush()
+            self.text.detach()
+        if self.compress:
+            self.stream.close()
+        self.file.close()
+        self.file = None
+
+    def close(self):
+        if self.file is None:
+            return
+        self.flush()
+        os.replace(f'{self.path}.tmp', self.path)
+        self.paths.append(self.path)
+        self.shard += 1
+
+    def abort(self):
+        if self.file is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self.file = None
+            os.remove(f'{self.path}.tmp')
+
+    def write(self, row):
+        if self.file is None:
+            self.open()
+        elif self.shard_size and self.rows >= self.shard_size:
+            self.close()
+            self.open()
+        if self.file_format == 'csv':
+            self.writer.writerow({
+                field: (orjson.dumps(value).decode()
+                        if isinstance(value, (list, dict)) else value)
+                for field, value in row.items()
+            })
+        else:
+            self.stream.write(orjson.dumps(row) + b'\n')
+        self.rows += 1
+        self.total += 1
+
+
+class Command(BaseCommand):
+
+    help = 'Выгружает рецепты, избранное и подписки в JSONL или CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default='export',
+            help='Каталог для файлов выгрузки.')
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'), default='jsonl',
+            help='Формат файлов выгрузки.')
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Сжимать файлы выгрузки gzip.')
+        parser.add_argument(
+            '--shard-size', type=int, default=0,
+            help='Количество строк в одном файле, 0 — без разбиения.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+            help='Количество строк, читаемых из базы за один раз.')
+        parser.add_argument(
+            '--datasets', nargs='+',
+            choices=('recipes', 'favourites', 'subscriptions'),
+            default=('recipes', 'favourites', 'subscriptions'),
+            help='Какие данные выгружать.')
+
+    def handle(self, *args, **options):
+        os.makedirs(options['output'], exist_ok=True)
+        datasets = {
+            'recipes': (RECIPE_FIELDS, self.get_recipes),
+            'favourites': (FAVOURITE_FIELDS, self.get_favourites),
+            'subscriptions': (SUBSCRIPTION_FIELDS, self.get_subscriptions),
+        }
+        for name in options['datasets']:
+            fields, get_rows = datasets[name]
+            writer = ShardWriter(
+                options['output'], name, options['format'], fields,
+                options['gzip'], options['shard_size'],
+            )
+            try:
+                for row in get_rows(options['chunk_size']):
+                    writer.write(row)
+                if not writer.total:
+                    writer.open()
+            except BaseException:
+                writer.abort()
+                raise
+            writer.close()
+            self.stdout.write(
+                f'{name}: выгружено строк {writer.total}, '
+                f'файлов {len(writer.paths)}.')
+
+    def get_recipes(self, chunk_size):
+        recipes = (
+            Recipe.objects
+            .select_related('author')
+            .prefetch_related('tags', 'recipe_ingredients__ingredient')
+            .order_by('id')
+            .iterator(chunk_size=chunk_size)
+        )
+        for recipe in recipes:
+            yield {
+                'id': recipe.id,
+                'name': recipe.name,
+                'text': recipe.text,
+                'cooking_time': recipe.cooking_time,
+                'image': recipe.image.name or None,
+                'short_link': recipe.short_link,
+                'favorites_count': recipe.favorites_count,
+                'updated_at': recipe.updated_at.isoformat(),
+                'author_id': recipe.author_id,
+                'author_username': recipe.author.username,
+                'author_email': recipe.author.email,
+                'tags': [tag.slug for tag in recipe.tags.all()],
+                'ingredients': [
+                    {
+                        'id': item.ingredient_id,
+                        'name': item.ingredient.name,
+                        'measurement_unit': item.ingredient.measurement_unit,
+                        'amount': item.amount,
+                    }
+                    for item in recipe.recipe_ingredients.all()
+                ],
+            }
+
+    def get_favourites(self, chunk_size):
+        return (
+            Favourite.objects
+            .order_by('id')
+            .values(*FAVOURITE_FIELDS)
+            .iterator(chunk_size=chunk_size)
+        )
+
+    def get_subscriptions(self, chunk_size):
+        return (
+            Subscription.objects
+            .order_by('id')
+            .values(*SUBSCRIPTION_FIELDS)
+            .iterator(chunk_size=chunk_size)
+        )
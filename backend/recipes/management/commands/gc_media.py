@@ -0,0 +1,109 @@
+import os
+import shutil
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.constants import GC_MEDIA_BATCH_SIZE, GC_MEDIA_GRACE_HOURS
+from recipes.models import MediaBlob, Recipe
+from users.models import User
+
+REFERENCES = ((Recipe, 'image'), (User, 'avatar'))
+
+
+def walk_files(root, skip):
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if os.path.realpath(entry.path) != skip:
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+
+class Command(BaseCommand):
+
+    help = 'Удаляет из MEDIA_ROOT файлы, на которые нет ссылок в базе'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours', type=float, default=GC_MEDIA_GRACE_HOURS,
+            help='Не трогать файлы моложе указанного количества часов.')
+        parser.add_argument(
+            '--quarantine',
+            help='Перемещать файлы в каталог вместо удаления.')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только вывести найденные файлы.')
+        parser.add_argument(
+            '--batch-size', type=int, default=GC_MEDIA_BATCH_SIZE,
+            help='Количество файлов, проверяемых за один запрос.')
+
+    def handle(self, *args, **options):
+        self.root = os.path.realpath(settings.MEDIA_ROOT)
+        if not os.path.isdir(self.root):
+            raise CommandError(f'Каталог {self.root} не найден.')
+        self.quarantine = options['quarantine'] and os.path.realpath(
+            options['quarantine'])
+        self.dry_run = options['dry_run']
+        deadline = time.time() - options['grace_hours'] * 60 * 60
+        scanned = orphans = size = 0
+        files = walk_files(self.root, self.quarantine)
+        while True:
+            batch = {
+                os.path.relpath(entry.path, self.root).replace(os.sep, '/'):
+                entry
+                for entry in islice(files, options['batch_size'])
+            }
+            if not batch:
+                break
+            scanned += len(batch)
+            referenced = self.get_referenced(list(batch))
+            removed = []
+            for name, entry in batch.items():
+                if name in referenced:
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                if stat.st_mtime > deadline:
+                    continue
+                self.remove(name, entry.path)
+                removed.append(name)
+                size += stat.st_size
+            if removed and not self.dry_run:
+                MediaBlob.objects.filter(
+                    name__in=removed, refcount=0).delete()
+            orphans += len(removed)
+        action = 'Найдено' if self.dry_run else (
+            'Перемещено' if self.quarantine else 'Удалено')
+        self.stdout.write(
+            f'Проверено файлов: {scanned}. {action} файлов: {orphans} '
+            f'({size} байт).')
+
+    def get_referenced(self, names):
+        referenced = set()
+        for model, field in REFERENCES:
+            referenced.update(
+                model.objects.filter(**{f'{field}__in': names})
+                .values_list(field, flat=True))
+        return referenced
+
+    def remove(self, name, path):
+        if self.dry_run:
+            self.stdout.write(name)
+        elif self.quarantine:
+            target = os.path.join(self.quarantine, name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.move(path, target)
+        else:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
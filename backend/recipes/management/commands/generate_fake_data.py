@@ -0,0 +1,324 @@
+import io
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from PIL import Image
+
+from recipes.constants import (FAKE_DATA_BATCH_SIZE, FAKE_DATA_PASSWORD,
+                               FAKE_DATA_ZIPF, FEED_BACKFILL_SIZE,
+                               FEED_FANOUT_LIMIT)
+from recipes.models import (Favourite, FeedEntry, Ingredient, Recipe,
+                            RecipeIngredient, RecipeTag, ShoppingCart, Tag)
+from recipes.search import INGREDIENT_INDEX
+from recipes.storage import acquire_blob
+from recipes.versions import (POPULARITY_VERSION, PUBLIC_CONTENT_VERSION,
+                              bump_version)
+from users.models import Subscription, User
+
+PLACEHOLDER_IMAGE = 'recipes/images/placeholder.png'
+FIRST_NAMES = ('Анна', 'Иван', 'Мария', 'Пётр', 'Ольга', 'Сергей', 'Елена')
+LAST_NAMES = ('Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Соколов', 'Волков')
+SENTENCES = (
+    'Нарежьте все ингредиенты небольшими кусочками.',
+    'Разогрейте сковороду и добавьте немного масла.',
+    'Готовьте на среднем огне, периодически помешивая.',
+    'Посолите и поперчите по вкусу.',
+    'Подавайте горячим, украсив зеленью.',
+    'Оставьте настояться на десять минут.',
+)
+
+
+def copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+class Command(BaseCommand):
+
+    help = 'Создаёт случайных пользователей, рецепты, избранное и подписки'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users', type=int, default=1000,
+            help='Количество пользователей.')
+        parser.add_argument(
+            '--recipes', type=int, default=10000,
+            help='Количество рецептов.')
+        parser.add_argument(
+            '--favorites', type=float, default=20,
+            help='Среднее количество избранных рецептов на пользователя.')
+        parser.add_argument(
+            '--carts', type=float, default=5,
+            help='Среднее количество рецептов в корзине пользователя.')
+        parser.add_argument(
+            '--subscriptions', type=float, default=10,
+            help='Среднее количество подписок на пользователя.')
+        parser.add_argument(
+            '--zipf', type=float, default=FAKE_DATA_ZIPF,
+            help='Параметр распределения Ципфа (больше 1).')
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора случайных чисел.')
+        parser.add_argument(
+            '--batch-size', type=int, default=FAKE_DATA_BATCH_SIZE,
+            help='Количество строк, записываемых за один раз.')
+        parser.add_argument(
+            '--with-feed', action='store_true',
+            help='Заполнить ленты подписок.')
+
+    def handle(self, *args, **options):
+        if options['zipf'] <= 1:
+            raise CommandError('Параметр --zipf должен быть больше 1.')
+        self.ingredient_ids = np.array(
+            Ingredient.objects.order_by('id').values_list('id', flat=True))
+        self.tag_ids = np.array(
+            Tag.objects.order_by('id').values_list('id', flat=True))
+        if not len(self.ingredient_ids) or not len(self.tag_ids):
+            raise CommandError(
+                'Сначала загрузите ингредиенты и теги: '
+                'import_ingredients и import_tags.')
+        self.rng = np.random.default_rng(options['seed'])
+        self.zipf = options['zipf']
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+
+        with transaction.atomic():
+            user_ids = self.create_users(options['users'])
+            recipe_ids, author_ids = self.create_recipes(
+                options['recipes'], user_ids)
+            self.create_user_recipes(
+                Favourite, user_ids, recipe_ids, options['favorites'])
+            self.create_user_recipes(
+                ShoppingCart, user_ids, recipe_ids, options['carts'])
+            subscriptions = self.create_subscriptions(
+                user_ids, options['subscriptions'])
+            if options['with_feed']:
+                self.create_feed(subscriptions, recipe_ids, author_ids)
+            self.reset_sequences()
+            self.count_favorites(recipe_ids)
+            self.count_followers(user_ids)
+            transaction.on_commit(lambda: bump_version(INGREDIENT_INDEX))
+            transaction.on_commit(
+                lambda: bump_version(PUBLIC_CONTENT_VERSION))
+            transaction.on_commit(lambda: bump_version(POPULARITY_VERSION))
+        if settings.SNAPSHOT_ROOT:
+            call_command('publish_snapshots', full=True)
+
+    def next_id(self, model):
+        return (model.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+
+    def zipf_choice(self, items, size):
+        ranks = (self.rng.zipf(self.zipf, size) - 1) % len(items)
+        return items[ranks]
+
+    def insert(self, model, rows):
+        fields = model._meta.concrete_fields
+        defaults = {field.attname: field.get_default() for field in fields}
+        total = 0
+        rows = iter(rows)
+        while batch := list(islice(rows, self.batch_size)):
+            batch = [{**defaults, **row} for row in batch]
+            if connection.vendor == 'postgresql':
+                self.copy(model, fields, batch)
+            else:
+                model.objects.bulk_create(model(**row) for row in batch)
+            total += len(batch)
+        self.stdout.write(
+            f'{model._meta.verbose_name_plural}: создано {total}.')
+
+    def copy(self, model, fields, rows):
+        fields = [
+            field for field in fields
+            if not (field.primary_key and rows[0][field.attname] is None)
+        ]
+        columns = [field.column for field in fields]
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write('\t'.join(
+                copy_value(row[field.attname]) for field in fields))
+            buffer.write('\n')
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                'COPY {} ({}) FROM STDIN'.format(
+                    connection.ops.quote_name(model._meta.db_table),
+                    ', '.join(map(connection.ops.quote_name, columns)),
+                ),
+                buffer,
+            )
+
+    def reset_sequences(self):
+        sequences = connection.ops.sequence_reset_sql(no_style(), [
+            User, Recipe, RecipeIngredient, RecipeTag, Favourite,
+            ShoppingCart, Subscription, FeedEntry,
+        ])
+        with connection.cursor() as cursor:
+            for sql in sequences:
+                cursor.execute(sql)
+
+    def count_favorites(self, recipe_ids):
+        if not len(recipe_ids):
+            return
+        Recipe.objects.filter(id__gte=int(recipe_ids[0])).update(
+            favorites_count=Coalesce(Subquery(
+                Favourite.objects
+                .filter(recipe=OuterRef('pk'))
+                .order_by()
+                .values('recipe')
+                .annotate(total=Count('pk'))
+                .values('total')
+            ), 0)
+        )
+
+    def count_followers(self, user_ids):
+        if not len(user_ids):
+            return
+        User.objects.filter(id__gte=int(user_ids[0])).update(
+            followers_count=Coalesce(Subquery(
+                Subscription.objects
+                .filter(subscribing=OuterRef('pk'))
+                .order_by()
+                .values('subscribing')
+                .annotate(total=Count('pk'))
+                .values('total')
+            ), 0)
+        )
+        User.objects.filter(
+            followers_count__gt=FEED_FANOUT_LIMIT, is_pull_author=False
+        ).update(is_pull_author=True)
+
+    def create_users(self, count):
+        first_id = self.next_id(User)
+        password = make_password(FAKE_DATA_PASSWORD)
+        first_names = self.rng.integers(len(FIRST_NAMES), size=count)
+        last_names = self.rng.integers(len(LAST_NAMES), size=count)
+        self.insert(User, (
+            {
+                'id': first_id + number,
+                'username': f'user{first_id + number}',
+                'email': f'user{first_id + number}@example.com',
+                'first_name': FIRST_NAMES[first_names[number]],
+                'last_name': LAST_NAMES[last_names[number]],
+                'password': password,
+                'date_joined': self.now,
+                'updated_at': self.now,
+            }
+            for number in range(count)
+        ))
+        return np.arange(first_id, first_id + count)
+
+    def get_placeholder_image(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (600, 400), (220, 220, 220)).save(
+            buffer, format='PNG')
+        return default_storage.save(
+            PLACEHOLDER_IMAGE, ContentFile(buffer.getvalue()))
+
+    def create_recipes(self, count, user_ids):
+        first_id = self.next_id(Recipe)
+        recipe_ids = np.arange(first_id, first_id + count)
+        author_ids = self.zipf_choice(self.rng.permutation(user_ids), count)
+        image = self.get_placeholder_image()
+        cooking_times = self.rng.integers(5, 181, size=count)
+        texts = self.rng.integers(len(SENTENCES), size=(count, 3))
+        self.insert(Recipe, (
+            {
+                'id': int(recipe_ids[number]),
+                'name': f'Рецепт {recipe_ids[number]}',
+                'text': ' '.join(SENTENCES[index] for index in texts[number]),
+                'author_id': int(author_ids[number]),
+                'image': image,
+                'cooking_time': int(cooking_times[number]),
+                'short_link': str(recipe_ids[number]),
+                'updated_at': self.now,
+            }
+            for number in range(count)
+        ))
+        acquire_blob(image, count)
+        popular_ingredients = self.rng.permutation(self.ingredient_ids)
+        self.insert(RecipeIngredient, (
+            {
+                'recipe_id': int(recipe_id),
+                'ingredient_id': int(ingredient_id),
+                'amount': int(self.rng.integers(1, 501)),
+            }
+            for recipe_id in recipe_ids
+            for ingredient_id in np.unique(self.zipf_choice(
+                popular_ingredients, int(self.rng.integers(3, 13))))
+        ))
+        self.insert(RecipeTag, (
+            {'recipe_id': int(recipe_id), 'tag_id': int(tag_id)}
+            for recipe_id in recipe_ids
+            for tag_id in self.rng.choice(
+                self.tag_ids,
+                int(self.rng.integers(1, min(3, len(self.tag_ids)) + 1)),
+                replace=False,
+            )
+        ))
+        return recipe_ids, author_ids
+
+    def get_pairs(self, user_ids, targets, average):
+        totals = self.rng.poisson(average, size=len(user_ids))
+        chosen = self.zipf_choice(
+            self.rng.permutation(targets), int(totals.sum()))
+        offsets = np.concatenate(([0], np.cumsum(totals)))
+        for number, user_id in enumerate(user_ids):
+            for target in np.unique(
+                    chosen[offsets[number]:offsets[number + 1]]):
+                yield int(user_id), int(target)
+
+    def create_user_recipes(self, model, user_ids, recipe_ids, average):
+        if not len(recipe_ids):
+            return
+        self.insert(model, (
+            {'user_id': user_id, 'recipe_id': recipe_id}
+            for user_id, recipe_id in self.get_pairs(
+                user_ids, recipe_ids, average)
+        ))
+
+    def create_subscriptions(self, user_ids, average):
+        subscriptions = [
+            (user_id, author_id)
+            for user_id, author_id in self.get_pairs(
+                user_ids, user_ids, average)
+            if user_id != author_id
+        ]
+        self.insert(Subscription, (
+            {'user_id': user_id, 'subscribing_id': author_id}
+            for user_id, author_id in subscriptions
+        ))
+        return subscriptions
+
+    def create_feed(self, subscriptions, recipe_ids, author_ids):
+        followers = {}
+        for _, author_id in subscriptions:
+            followers[author_id] = followers.get(author_id, 0) + 1
+        order = np.lexsort((-recipe_ids, author_ids))
+        authors, starts = np.unique(author_ids[order], return_index=True)
+        ends = np.append(starts[1:], len(order))
+        recipes = {
+            int(author_id): recipe_ids[order[start:end]][:FEED_BACKFILL_SIZE]
+            for author_id, start, end in zip(authors, starts, ends)
+        }
+        self.insert(FeedEntry, (
+            {'user_id': user_id, 'recipe_id': int(recipe_id),
+             'author_id': author_id}
+            for user_id, author_id in subscriptions
+            if followers[author_id] <= FEED_FANOUT_LIMIT
+            for recipe_id in recipes.get(author_id, ())
+        ))
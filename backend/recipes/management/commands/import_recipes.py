@@ -0,0 +1,231 @@
+import os
+import zipfile
+from collections import Counter, defaultdict
+from functools import partial
+
+import orjson
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from recipes.constants import IMPORT_BATCH_SIZE, MAX, MIN, RECIPE_NAME_LENGTH
+from recipes.feed import fan_out_recipes
+from recipes.models import (ImportCheckpoint, Ingredient, Recipe,
+                            RecipeIngredient, RecipeTag, Tag)
+from recipes.search import INGREDIENT_INDEX
+from recipes.storage import acquire_blob
+from recipes.versions import PUBLIC_CONTENT_VERSION, bump_version
+from users.models import User
+
+
+class ImageSource:
+
+    def __init__(self, path):
+        self.archive = None
+        self.directory = None
+        if path is None:
+            return
+        if zipfile.is_zipfile(path):
+            self.archive = zipfile.ZipFile(path)
+        elif os.path.isdir(path):
+            self.directory = os.path.realpath(path)
+        else:
+            raise CommandError(f'Не найдены изображения: {path}.')
+
+    def read(self, name):
+        if self.archive is not None:
+            try:
+                return self.archive.read(name)
+            except KeyError:
+                raise ValueError(f'нет изображения {name}')
+        if self.directory is None:
+            raise ValueError('не указан каталог или архив изображений')
+        path = os.path.realpath(os.path.join(self.directory, name))
+        if os.path.commonpath((self.directory, path)) != self.directory:
+            raise ValueError(f'недопустимый путь изображения {name}')
+        try:
+            with open(path, 'rb') as image:
+                return image.read()
+        except OSError:
+            raise ValueError(f'нет изображения {name}')
+
+
+class Command(BaseCommand):
+
+    help = 'Импортирует рецепты из JSONL-файла и архива изображений'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='JSONL-файл с рецептами.')
+        parser.add_argument(
+            '--images',
+            help='Каталог или zip-архив с изображениями рецептов.')
+        parser.add_argument(
+            '--author',
+            help='Email автора для рецептов без поля author.')
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+            help='Количество рецептов в одной транзакции.')
+        parser.add_argument(
+            '--checkpoint',
+            help='Имя контрольной точки, по умолчанию полный путь к файлу.')
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Начать импорт заново, игнорируя контрольную точку.')
+
+    def handle(self, *args, **options):
+        self.images = ImageSource(options['images'])
+        self.image_field = Recipe._meta.get_field('image')
+        self.default_author = None
+        if options['author']:
+            self.default_author = (
+                User.objects.filter(email=options['author'])
+                .values_list('id', flat=True).first()
+            )
+            if self.default_author is None:
+                raise CommandError(
+                    f'Пользователь {options["author"]} не найден.')
+        self.ingredients = {}
+        for ingredient_id, name, unit in Ingredient.objects.order_by(
+                '-id').values_list('id', 'name', 'measurement_unit'):
+            self.ingredients[name.lower()] = ingredient_id
+            self.ingredients[name.lower(), unit.lower()] = ingredient_id
+        self.tags = dict(Tag.objects.values_list('slug', 'id'))
+
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+            source=(options['checkpoint']
+                    or os.path.realpath(options['path'])))
+        if options['restart']:
+            checkpoint.offset = checkpoint.line = 0
+            checkpoint.imported = checkpoint.skipped = 0
+            checkpoint.save()
+        elif checkpoint.line:
+            self.stdout.write(f'Продолжение со строки {checkpoint.line + 1}.')
+
+        with open(options['path'], 'rb') as source:
+            source.seek(checkpoint.offset)
+            offset, number = checkpoint.offset, checkpoint.line
+            while True:
+                lines = []
+                while len(lines) < options['batch_size']:
+                    line = source.readline()
+                    if not line:
+                        break
+                    offset += len(line)
+                    number += 1
+                    if line.strip():
+                        lines.append((number, line))
+                if not lines:
+                    break
+                checkpoint.offset, checkpoint.line = offset, number
+                self.import_batch(lines, checkpoint)
+                self.stdout.write(
+                    f'Строка {checkpoint.line}: импортировано '
+                    f'{checkpoint.imported}, пропущено {checkpoint.skipped}.')
+        bump_version(INGREDIENT_INDEX)
+        bump_version(PUBLIC_CONTENT_VERSION)
+        if settings.SNAPSHOT_ROOT:
+            call_command('publish_snapshots')
+
+    def parse(self, line, authors):
+        record = orjson.loads(line)
+        name = str(record['name']).strip()
+        if not name or len(name) > RECIPE_NAME_LENGTH:
+            raise ValueError('некорректное название')
+        cooking_time = int(record['cooking_time'])
+        if not MIN <= cooking_time <= MAX:
+            raise ValueError('некорректное время приготовления')
+        author_id = (authors.get(record['author'])
+                     if record.get('author') else self.default_author)
+        if author_id is None:
+            raise ValueError('не найден автор')
+        ingredients = {}
+        for item in record['ingredients']:
+            key = item['name'].strip().lower()
+            if item.get('measurement_unit'):
+                key = (key, item['measurement_unit'].strip().lower())
+            ingredient_id = self.ingredients.get(key)
+            if ingredient_id is None:
+                raise ValueError(f'неизвестный ингредиент {item["name"]}')
+            if ingredient_id in ingredients:
+                raise ValueError(f'повторяется ингредиент {item["name"]}')
+            amount = int(item['amount'])
+            if not MIN <= amount <= MAX:
+                raise ValueError(f'некорректное количество {item["name"]}')
+            ingredients[ingredient_id] = amount
+        tags = set()
+        for slug in record['tags']:
+            if slug not in self.tags:
+                raise ValueError(f'неизвестный тег {slug}')
+            tags.add(self.tags[slug])
+        if not ingredients or not tags:
+            raise ValueError('нет ингредиентов или тегов')
+        recipe = Recipe(
+            name=name,
+            text=str(record['text']),
+            cooking_time=cooking_time,
+            author_id=author_id,
+        )
+        return recipe, record.get('image'), ingredients, tags
+
+    def import_batch(self, lines, checkpoint):
+        emails = set()
+        for _, line in lines:
+            try:
+                emails.add(orjson.loads(line).get('author'))
+            except (orjson.JSONDecodeError, AttributeError):
+                pass
+        authors = dict(User.objects.filter(
+            email__in=emails - {None}).values_list('email', 'id'))
+        parsed = []
+        for number, line in lines:
+            try:
+                recipe, image, ingredients, tags = self.parse(line, authors)
+                if image:
+                    recipe.image = self.image_field.generate_filename(
+                        recipe, os.path.basename(image))
+                    image = self.images.read(image)
+            except (ValueError, KeyError, TypeError, AttributeError,
+                    orjson.JSONDecodeError) as error:
+                self.stderr.write(f'Строка {number}: {error}.')
+                continue
+            parsed.append((recipe, image, ingredients, tags))
+
+        for recipe, image, _, _ in parsed:
+            if image:
+                recipe.image.name = self.image_field.storage.save(
+                    recipe.image.name, ContentFile(image))
+
+        with transaction.atomic():
+            recipes = Recipe.objects.bulk_create(
+                recipe for recipe, _, _, _ in parsed)
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(
+                    recipe_id=recipe.id, ingredient_id=ingredient_id,
+                    amount=amount,
+                )
+                for recipe, (_, _, ingredients, _) in zip(recipes, parsed)
+                for ingredient_id, amount in ingredients.items()
+            )
+            RecipeTag.objects.bulk_create(
+                RecipeTag(recipe_id=recipe.id, tag_id=tag_id)
+                for recipe, (_, _, _, tags) in zip(recipes, parsed)
+                for tag_id in tags
+            )
+            for recipe in recipes:
+                recipe.short_link = str(recipe.id)
+            Recipe.objects.bulk_update(recipes, ['short_link'])
+            for name, count in Counter(
+                    recipe.image.name for recipe in recipes
+                    if recipe.image).items():
+                acquire_blob(name, count)
+            by_author = defaultdict(list)
+            for recipe in recipes:
+                by_author[recipe.author_id].append(recipe.id)
+            for author_id, recipe_ids in by_author.items():
+                transaction.on_commit(
+                    partial(fan_out_recipes, recipe_ids, author_id))
+            checkpoint.imported += len(recipes)
+            checkpoint.skipped += len(lines) - len(recipes)
+            checkpoint.save()
@@ -0,0 +1,55 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from recipes.constants import (TRENDING_BATCH_SIZE, TRENDING_HALF_LIFE_HOURS,
+                               TRENDING_WINDOW_DAYS)
+from recipes.models import Recipe, RecipeActivity
+from recipes.versions import POPULARITY_VERSION, bump_version
+
+
+class Command(BaseCommand):
+
+    help = 'Пересчитывает рейтинг популярности рецептов за последнее время'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--half-life', type=float, default=TRENDING_HALF_LIFE_HOURS,
+            help='Период полураспада веса события, в часах.')
+        parser.add_argument(
+            '--window', type=int, default=TRENDING_WINDOW_DAYS,
+            help='Сколько дней хранить события.')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        half_life = options['half_life'] * 3600
+        RecipeActivity.objects.filter(
+            created_at__lt=now - timedelta(days=options['window'])
+        ).delete()
+
+        scores = defaultdict(float)
+        activities = (
+            RecipeActivity.objects
+            .filter(created_at__lte=now)
+            .order_by()
+            .values_list('recipe_id', 'weight', 'created_at')
+            .iterator(chunk_size=TRENDING_BATCH_SIZE)
+        )
+        for recipe_id, weight, created_at in activities:
+            age = (now - created_at).total_seconds()
+            scores[recipe_id] += weight * 0.5 ** (age / half_life)
+
+        Recipe.objects.filter(trending_score__gt=0).exclude(
+            Exists(RecipeActivity.objects.filter(recipe=OuterRef('pk')))
+        ).update(trending_score=0)
+        Recipe.objects.bulk_update(
+            (Recipe(id=recipe_id, trending_score=score)
+             for recipe_id, score in scores.items()),
+            ['trending_score'],
+            batch_size=TRENDING_BATCH_SIZE,
+        )
+        bump_version(POPULARITY_VERSION)
+        self.stdout.write(f'Обновлено рецептов: {len(scores)}.')
@@ -0,0 +1,106 @@
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from foodgram.db_router import use_primary
+from recipes.constants import MEMBERSHIP_LOCAL_SIZE, MEMBERSHIP_TIMEOUT
+from recipes.models import Favourite, ShoppingCart
+from recipes.versions import bump_version, get_version, membership_version
+
+
+def contains(ids, recipe_id):
+    index = bisect_left(ids, recipe_id)
+    return index < len(ids) and ids[index] == recipe_id
+
+
+class Membership:
+
+    def __init__(self, favorited, in_shopping_cart):
+        self.favorited = favorited
+        self.in_shopping_cart = in_shopping_cart
+
+    @classmethod
+    def load(cls, user_id):
+        with use_primary():
+            return cls(*(
+                array('q', model.objects.filter(user_id=user_id)
+                      .order_by('recipe_id')
+                      .values_list('recipe_id', flat=True))
+                for model in (Favourite, ShoppingCart)
+            ))
+
+    @classmethod
+    def from_bytes(cls, data):
+        favorited, in_shopping_cart = array('q'), array('q')
+        favorited.frombytes(data[0])
+        in_shopping_cart.frombytes(data[1])
+        return cls(favorited, in_shopping_cart)
+
+    def to_bytes(self):
+        return self.favorited.tobytes(), self.in_shopping_cart.tobytes()
+
+    def is_favorited(self, recipe_id):
+        return contains(self.favorited, recipe_id)
+
+    def is_in_shopping_cart(self, recipe_id):
+        return contains(self.in_shopping_cart, recipe_id)
+
+
+class MembershipCache:
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id, version):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None or entry[0] != version:
+                return None
+            self.entries.move_to_end(user_id)
+            return entry[1]
+
+    def set(self, user_id, version, membership):
+        with self.lock:
+            self.entries[user_id] = (version, membership)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+
+local_cache = MembershipCache(MEMBERSHIP_LOCAL_SIZE)
+
+
+def membership_key(user_id, version):
+    return f'membership:{user_id}:{version}'
+
+
+def store_membership(user_id, version, membership):
+    local_cache.set(user_id, version, membership)
+    cache.set(
+        membership_key(user_id, version), membership.to_bytes(),
+        MEMBERSHIP_TIMEOUT)
+
+
+def get_membership(user):
+    version = get_version(membership_version(user.pk))
+    membership = local_cache.get(user.pk, version)
+    if membership is not None:
+        return membership
+    data = cache.get(membership_key(user.pk, version))
+    if data is None:
+        membership = Membership.load(user.pk)
+        store_membership(user.pk, version, membership)
+    else:
+        membership = Membership.from_bytes(data)
+        local_cache.set(user.pk, version, membership)
+    return membership
+
+
+def refresh_membership(user_id):
+    version = bump_version(membership_version(user_id))
+    store_membership(user_id, version, Membership.load(user_id))
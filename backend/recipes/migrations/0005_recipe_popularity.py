@@ -0,0 +1,63 @@
+# Generated by Django 4.2.16 on 2026-10-19 12:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_favorites(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Favourite = apps.get_model('recipes', 'Favourite')
+    favorites = (
+        Favourite.objects
+        .filter(recipe=OuterRef('pk'))
+        .order_by()
+        .values('recipe')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    Recipe.objects.update(favorites_count=Coalesce(Subquery(favorites), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_recipe_updated_at_similarrecipe'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Добавлений в избранное'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='trending_score',
+            field=models.FloatField(default=0, verbose_name='Рейтинг популярности'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-favorites_count', '-id'], name='recipe_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-trending_score', '-id'], name='recipe_trending_idx'),
+        ),
+        migrations.CreateModel(
+            name='RecipeActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weight', models.PositiveSmallIntegerField(verbose_name='Вес')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activities', to='recipes.recipe', verbose_name='Рецепт')),
+            ],
+            options={
+                'verbose_name': 'Активность по рецепту',
+                'verbose_name_plural': 'Активность по рецептам',
+                'ordering': ('-created_at',),
+            },
+        ),
+        migrations.RunPython(count_favorites, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.16 on 2026-10-19 16:05
+
+from django.db import migrations
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS recipe_name_trgm_idx '
+        'ON recipes_recipe USING gin (UPPER(name) gin_trgm_ops)'
+    )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'DROP INDEX CONCURRENTLY IF EXISTS recipe_name_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('recipes', '0006_alter_recipe_author'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
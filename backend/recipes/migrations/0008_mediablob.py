@@ -0,0 +1,53 @@
+# Generated by Django 4.2.16 on 2026-10-19 18:40
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_refcounts(apps, schema_editor):
+    MediaBlob = apps.get_model('recipes', 'MediaBlob')
+    counts = {}
+    for model, field in (('recipes.Recipe', 'image'),
+                         ('users.User', 'avatar')):
+        rows = (
+            apps.get_model(model).objects
+            .exclude(**{f'{field}__isnull': True})
+            .exclude(**{field: ''})
+            .order_by()
+            .values_list(field)
+            .annotate(total=Count('pk'))
+        )
+        for name, total in rows:
+            counts[name] = counts.get(name, 0) + total
+    MediaBlob.objects.bulk_create(
+        (MediaBlob(name=name, refcount=total)
+         for name, total in counts.items()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipe_search_indexes'),
+        ('users', '0004_user_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Путь к файлу')),
+                ('refcount', models.PositiveIntegerField(default=0, verbose_name='Количество ссылок')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+            ],
+            options={
+                'verbose_name': 'Медиафайл',
+                'verbose_name_plural': 'Медиафайлы',
+                'ordering': ('name',),
+                'indexes': [models.Index(fields=['refcount'], name='media_blob_refcount_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_refcounts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.16 on 2026-10-19 19:25
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0008_mediablob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('favorite', 'Избранное'), ('shopping_cart', 'Корзина покупок'), ('subscription', 'Подписка'), ('recipe', 'Рецепт')], max_length=16, verbose_name='Тип объекта')),
+                ('action', models.CharField(choices=[('add', 'Добавление'), ('remove', 'Удаление'), ('edit', 'Изменение')], max_length=8, verbose_name='Действие')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='Идентификатор объекта')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Дата')),
+                ('user', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Изменение',
+                'verbose_name_plural': 'Журнал изменений',
+                'ordering': ('id',),
+                'indexes': [models.Index(fields=['user', 'id'], name='changelog_user_idx'), models.Index(fields=['kind', 'object_id'], name='changelog_object_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.16 on 2026-10-19 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_changelog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255, unique=True, verbose_name='Источник')),
+                ('offset', models.PositiveBigIntegerField(default=0, verbose_name='Смещение в файле')),
+                ('line', models.PositiveIntegerField(default=0, verbose_name='Номер строки')),
+                ('imported', models.PositiveIntegerField(default=0, verbose_name='Импортировано')),
+                ('skipped', models.PositiveIntegerField(default=0, verbose_name='Пропущено')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Контрольная точка импорта',
+                'verbose_name_plural': 'Контрольные точки импорта',
+                'ordering': ('source',),
+            },
+        ),
+    ]
@@ -1,7 +1,10 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
 
-from recipes.constants import (INGR_NAME_LENGTH, INGR_UNIT_LENGTH, MAX, MIN,
+from recipes.constants import (CHANGE_ACTION_LENGTH, CHANGE_KIND_LENGTH,
+                               IMPORT_SOURCE_LENGTH, INGR_NAME_LENGTH,
+                               INGR_UNIT_LENGTH, MAX, MEDIA_NAME_LENGTH, MIN,
                                RECIPE_NAME_LENGTH, TAG_LENGTH)
 from users.models import User
 
@@ -115,6 +118,7 @@ class Recipe(models.Model):
         User,
         on_delete=models.CASCADE,
         verbose_name='Автор',
+        related_name='recipes',
     )
     ingredients = models.ManyToManyField(
         Ingredient,
@@ -139,11 +143,28 @@ class Recipe(models.Model):
     )
     short_link = models.URLField(unique=True, blank=True, null=True)
     full_link = models.URLField(blank=True, null=True)
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+        db_index=True,
+    )
+    favorites_count = models.PositiveIntegerField(
+        'Добавлений в избранное', default=0)
+    trending_score = models.FloatField('Рейтинг популярности', default=0)
 
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
         ordering = ('-id',)
+        indexes = [
+            models.Index(
+                fields=['-favorites_count', '-id'],
+                name='recipe_popular_idx'),
+            models.Index(
+                fields=['-trending_score', '-id'],
+                name='recipe_trending_idx'),
+            models.Index(fields=['image'], name='recipe_image_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
@@ -196,3 +217,175 @@ class ShoppingCart(models.Model):
 
     def __str__(self):
         return f'{self.user.username} добавил "{self.recipe.name}" в корзину'
+
+
+class RecipeActivity(models.Model):
+    recipe = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE,
+        verbose_name='Рецепт',
+        related_name='activities',
+    )
+    weight = models.PositiveSmallIntegerField('Вес')
+    created_at = models.DateTimeField(
+        'Дата', auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = 'Активность по рецепту'
+        verbose_name_plural = 'Активность по рецептам'
+        ordering = ('-created_at',)
+
+    def __str__(self):
+        return f'{self.recipe} +{self.weight}'
+
+
+class FeedEntry(models.Model):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE,
+        verbose_name='Подписчик',
+        related_name='feed_entries',
+    )
+    recipe = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE,
+        verbose_name='Рецепт',
+        related_name='feed_entries',
+    )
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE,
+        verbose_name='Автор',
+        related_name='+',
+    )
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Лента подписок'
+        ordering = ('-recipe',)
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipe'], name='unique_feed_entry')
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'author'], name='feed_user_author_idx')
+        ]
+
+    def __str__(self):
+        return f'{self.recipe} в ленте {self.user}'
+
+
+class SimilarRecipe(models.Model):
+    recipe = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE,
+        verbose_name='Рецепт',
+        related_name='similar_recipes',
+    )
+    similar = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE,
+        verbose_name='Похожий рецепт',
+        related_name='similar_to',
+    )
+    score = models.FloatField('Сходство')
+    computed_at = models.DateTimeField('Дата расчёта', default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Похожий рецепт'
+        verbose_name_plural = 'Похожие рецепты'
+        ordering = ('recipe', '-score')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipe', 'similar'], name='unique_similar_recipe')
+        ]
+        indexes = [
+            models.Index(
+                fields=['recipe', '-score'], name='similar_recipe_score_idx'),
+            models.Index(
+                fields=['computed_at'], name='similar_computed_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.recipe} - {self.similar}'
+
+
+class MediaBlob(models.Model):
+    name = models.CharField(
+        'Путь к файлу', max_length=MEDIA_NAME_LENGTH, unique=True)
+    refcount = models.PositiveIntegerField('Количество ссылок', default=0)
+    created_at = models.DateTimeField('Дата создания', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Медиафайл'
+        verbose_name_plural = 'Медиафайлы'
+        ordering = ('name',)
+        indexes = [
+            models.Index(fields=['refcount'], name='media_blob_refcount_idx')
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class ChangeLog(models.Model):
+    FAVORITE = 'favorite'
+    SHOPPING_CART = 'shopping_cart'
+    SUBSCRIPTION = 'subscription'
+    RECIPE = 'recipe'
+    KIND_CHOICES = (
+        (FAVORITE, 'Избранное'),
+        (SHOPPING_CART, 'Корзина покупок'),
+        (SUBSCRIPTION, 'Подписка'),
+        (RECIPE, 'Рецепт'),
+    )
+    ADD = 'add'
+    REMOVE = 'remove'
+    EDIT = 'edit'
+    ACTION_CHOICES = (
+        (ADD, 'Добавление'),
+        (REMOVE, 'Удаление'),
+        (EDIT, 'Изменение'),
+    )
+
+    user = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        verbose_name='Пользователь',
+        related_name='+',
+    )
+    kind = models.CharField(
+        'Тип объекта', max_length=CHANGE_KIND_LENGTH, choices=KIND_CHOICES)
+    action = models.CharField(
+        'Действие', max_length=CHANGE_ACTION_LENGTH, choices=ACTION_CHOICES)
+    object_id = models.PositiveBigIntegerField('Идентификатор объекта')
+    created_at = models.DateTimeField(
+        'Дата', default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = 'Изменение'
+        verbose_name_plural = 'Журнал изменений'
+        ordering = ('id',)
+        indexes = [
+            models.Index(fields=['user', 'id'], name='changelog_user_idx'),
+            models.Index(
+                fields=['kind', 'object_id'], name='changelog_object_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.object_id}: {self.action}'
+
+
+class ImportCheckpoint(models.Model):
+    source = models.CharField(
+        'Источник', max_length=IMPORT_SOURCE_LENGTH, unique=True)
+    offset = models.PositiveBigIntegerField('Смещение в файле', default=0)
+    line = models.PositiveIntegerField('Номер строки', default=0)
+    imported = models.PositiveIntegerField('Импортировано', default=0)
+    skipped = models.PositiveIntegerField('Пропущено', default=0)
+    updated_at = models.DateTimeField('Дата обновления', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Контрольная точка импорта'
+        verbose_name_plural = 'Контрольные точки импорта'
+        ordering = ('source',)
+
+    def __str__(self):
+        return f'{self.source}: строка {self.line}'
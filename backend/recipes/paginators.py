@@ -0,0 +1,20 @@
+import json
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from recipes.constants import ESTIMATED_COUNT_THRESHOLD
+
+
+class EstimatedCountPaginator(Paginator):
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if connections[queryset.db].vendor == 'postgresql':
+            plan = json.loads(queryset.explain(format='json'))
+            estimate = int(plan[0]['Plan']['Plan Rows'])
+            if estimate >= ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
@@ -0,0 +1,143 @@
+import heapq
+import threading
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from itertools import chain
+
+from django.core.cache import cache
+from django.db import connections
+
+from foodgram.db_router import use_primary
+from recipes.constants import (INDEX_BATCH_SIZE, INDEX_CHANGE_TIMEOUT,
+                               INDEX_CHANGES_LIMIT)
+from recipes.models import RecipeIngredient
+from recipes.versions import bump_version, get_version
+
+INGREDIENT_INDEX = 'ingredient_index'
+
+
+class SearchResult:
+
+    def __init__(self, covered, recipes):
+        self.covered = covered
+        self.recipes = recipes
+
+    def __len__(self):
+        return len(self.covered)
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop, step = index.indices(len(self))
+        top = heapq.nsmallest(stop, (
+            (-count, len(self.recipes[recipe_id]) - count, -recipe_id)
+            for recipe_id, count in self.covered.items()
+        ))
+        return [
+            (-recipe_id, -count, missing)
+            for count, missing, recipe_id in top[start:stop:step]
+        ]
+
+
+class IngredientIndex:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.state = None
+
+    def build(self):
+        postings = defaultdict(lambda: array('L'))
+        recipes = defaultdict(lambda: array('L'))
+        rows = (
+            RecipeIngredient.objects
+            .order_by('recipe_id', 'ingredient_id')
+            .values_list('recipe_id', 'ingredient_id')
+            .iterator(chunk_size=INDEX_BATCH_SIZE)
+        )
+        for recipe_id, ingredient_id in rows:
+            postings[ingredient_id].append(recipe_id)
+            recipes[recipe_id].append(ingredient_id)
+        return dict(postings), dict(recipes)
+
+    def reindex(self, postings, recipes, recipe_ids):
+        postings, recipes = dict(postings), dict(recipes)
+        copied = set()
+
+        def get_posting(ingredient_id):
+            if ingredient_id not in copied:
+                copied.add(ingredient_id)
+                postings[ingredient_id] = array(
+                    'L', postings.get(ingredient_id, ()))
+            return postings[ingredient_id]
+
+        for recipe_id in recipe_ids:
+            for ingredient_id in recipes.pop(recipe_id, ()):
+                posting = get_posting(ingredient_id)
+                index = bisect_left(posting, recipe_id)
+                if index < len(posting) and posting[index] == recipe_id:
+                    posting.pop(index)
+        rows = (
+            RecipeIngredient.objects
+            .filter(recipe_id__in=recipe_ids)
+            .order_by('recipe_id', 'ingredient_id')
+            .values_list('recipe_id', 'ingredient_id')
+        )
+        for recipe_id, ingredient_id in rows:
+            recipes.setdefault(recipe_id, array('L')).append(ingredient_id)
+            insort(get_posting(ingredient_id), recipe_id)
+        return postings, recipes
+
+    def refresh(self):
+        with self.lock, use_primary():
+            version = get_version(INGREDIENT_INDEX)
+            if self.state is not None and self.state[0] == version:
+                return
+            if (self.state is None or not 0 < version - self.state[0]
+                    <= INDEX_CHANGES_LIMIT):
+                postings, recipes = self.build()
+            else:
+                previous, postings, recipes = self.state
+                keys = [
+                    f'{INGREDIENT_INDEX}:change:{number}'
+                    for number in range(previous + 1, version + 1)
+                ]
+                changes = cache.get_many(keys)
+                if len(changes) == len(keys):
+                    postings, recipes = self.reindex(
+                        postings, recipes, set(changes.values()))
+                else:
+                    postings, recipes = self.build()
+            self.state = (version, postings, recipes)
+
+    def refresh_in_background(self):
+        try:
+            self.refresh()
+        finally:
+            connections.close_all()
+
+    def search(self, ingredient_ids):
+        if self.state is None:
+            self.refresh()
+        elif (self.state[0] != get_version(INGREDIENT_INDEX)
+                and not self.lock.locked()):
+            threading.Thread(
+                target=self.refresh_in_background, daemon=True).start()
+        _, postings, recipes = self.state
+        return SearchResult(Counter(chain.from_iterable(
+            postings.get(ingredient_id, ())
+            for ingredient_id in set(ingredient_ids)
+        )), recipes)
+
+
+def record_change(recipe_id):
+    version = bump_version(INGREDIENT_INDEX)
+    cache.set(
+        f'{INGREDIENT_INDEX}:change:{version}', recipe_id,
+        INDEX_CHANGE_TIMEOUT)
+
+
+ingredient_index = IngredientIndex()
@@ -0,0 +1,258 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from recipes.changelog import log_change
+from recipes.constants import FAVORITE_WEIGHT, SHOPPING_CART_WEIGHT
+from recipes.feed import (add_follower, backfill_author, fan_out_recipe,
+                          remove_author, remove_follower)
+from recipes.membership import refresh_membership
+from recipes.models import (ChangeLog, Favourite, Ingredient, Recipe,
+                            RecipeActivity, RecipeIngredient, RecipeTag,
+                            ShoppingCart, Tag)
+from recipes.search import record_change
+from recipes.storage import acquire_blob, release_blob
+from recipes.versions import (CATALOG_VERSION, POPULARITY_VERSION,
+                              PUBLIC_AUTHORS_VERSION, PUBLIC_CONTENT_VERSION,
+                              author_version, bump_version, recipe_version,
+                              user_state_version)
+from users.constants import PUBLIC_USER_FIELDS
+from users.models import Subscription, User
+
+MEDIA_FIELDS = {Recipe: 'image', User: 'avatar'}
+CHANGE_KINDS = {
+    Favourite: ChangeLog.FAVORITE,
+    ShoppingCart: ChangeLog.SHOPPING_CART,
+    Subscription: ChangeLog.SUBSCRIPTION,
+}
+
+
+@receiver((post_save, post_delete), sender=Tag)
+@receiver((post_save, post_delete), sender=Ingredient)
+def catalog_changed(**kwargs):
+    transaction.on_commit(partial(bump_version, CATALOG_VERSION))
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+@receiver((post_save, post_delete), sender=RecipeTag)
+def recipe_changed(sender, instance, **kwargs):
+    recipe_id = instance.pk if sender is Recipe else instance.recipe_id
+    transaction.on_commit(partial(bump_version, recipe_version(recipe_id)))
+
+
+@receiver(m2m_changed, sender=RecipeIngredient)
+@receiver(m2m_changed, sender=RecipeTag)
+def recipe_relations_changed(instance, action, reverse, **kwargs):
+    if not reverse and action.startswith('post_'):
+        transaction.on_commit(
+            partial(bump_version, recipe_version(instance.pk)))
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+@receiver((post_save, post_delete), sender=RecipeTag)
+@receiver(m2m_changed, sender=RecipeIngredient)
+@receiver(m2m_changed, sender=RecipeTag)
+def public_content_changed(**kwargs):
+    transaction.on_commit(partial(bump_version, PUBLIC_CONTENT_VERSION))
+
+
+def bump_public_authors():
+    bump_version(PUBLIC_AUTHORS_VERSION)
+    bump_version(PUBLIC_CONTENT_VERSION)
+
+
+def first_or_last_subscription(subscription):
+    return not Subscription.objects.filter(
+        user_id=subscription.user_id).exclude(pk=subscription.pk).exists()
+
+
+@receiver((post_save, post_delete), sender=Favourite)
+def popularity_changed(**kwargs):
+    transaction.on_commit(partial(bump_version, POPULARITY_VERSION))
+
+
+@receiver(pre_save, sender=User)
+def public_author_changing(instance, update_fields, **kwargs):
+    if instance.pk is None:
+        return
+    if update_fields is None or set(PUBLIC_USER_FIELDS) & set(update_fields):
+        instance._previous_public = (
+            User.objects.filter(pk=instance.pk)
+            .values_list(*PUBLIC_USER_FIELDS).first())
+
+
+@receiver(post_save, sender=User)
+def public_author_changed(instance, **kwargs):
+    previous = instance.__dict__.pop('_previous_public', None)
+    if previous is None:
+        return
+    if previous != tuple(
+            User._meta.get_field(field).get_prep_value(
+                getattr(instance, field))
+            for field in PUBLIC_USER_FIELDS):
+        transaction.on_commit(bump_public_authors)
+
+
+@receiver(post_save, sender=Subscription)
+def public_subscriber_added(instance, created, **kwargs):
+    if created and first_or_last_subscription(instance):
+        transaction.on_commit(bump_public_authors)
+
+
+@receiver(post_delete, sender=Subscription)
+def public_subscriber_removed(instance, **kwargs):
+    if first_or_last_subscription(instance):
+        transaction.on_commit(bump_public_authors)
+
+
+@receiver(post_save, sender=User)
+def author_changed(instance, **kwargs):
+    transaction.on_commit(partial(bump_version, author_version(instance.pk)))
+
+
+@receiver((post_save, post_delete), sender=Subscription)
+def author_subscriptions_changed(instance, **kwargs):
+    User.objects.filter(pk=instance.user_id).update(updated_at=timezone.now())
+    transaction.on_commit(
+        partial(bump_version, author_version(instance.user_id)))
+
+
+@receiver((post_save, post_delete), sender=Favourite)
+@receiver((post_save, post_delete), sender=ShoppingCart)
+@receiver((post_save, post_delete), sender=Subscription)
+def user_state_changed(instance, **kwargs):
+    transaction.on_commit(
+        partial(bump_version, user_state_version(instance.user_id)))
+
+
+@receiver((post_save, post_delete), sender=Favourite)
+@receiver((post_save, post_delete), sender=ShoppingCart)
+def membership_changed(instance, **kwargs):
+    transaction.on_commit(partial(refresh_membership, instance.user_id))
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_created(instance, created, **kwargs):
+    if created:
+        transaction.on_commit(
+            partial(fan_out_recipe, instance.pk, instance.author_id))
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+def recipe_ingredients_changed(sender, instance, **kwargs):
+    recipe_id = instance.pk if sender is Recipe else instance.recipe_id
+    transaction.on_commit(partial(record_change, recipe_id))
+
+
+@receiver(post_save, sender=Favourite)
+def favorite_created(instance, created, **kwargs):
+    if created:
+        Recipe.objects.filter(pk=instance.recipe_id).update(
+            favorites_count=F('favorites_count') + 1)
+        RecipeActivity.objects.create(
+            recipe_id=instance.recipe_id, weight=FAVORITE_WEIGHT)
+
+
+@receiver(post_delete, sender=Favourite)
+def favorite_deleted(instance, **kwargs):
+    Recipe.objects.filter(
+        pk=instance.recipe_id, favorites_count__gt=0
+    ).update(favorites_count=F('favorites_count') - 1)
+
+
+@receiver(post_save, sender=ShoppingCart)
+def shopping_cart_created(instance, created, **kwargs):
+    if created:
+        RecipeActivity.objects.create(
+            recipe_id=instance.recipe_id, weight=SHOPPING_CART_WEIGHT)
+
+
+@receiver(post_save, sender=Subscription)
+def subscription_created(instance, created, **kwargs):
+    if created:
+        add_follower(instance.subscribing_id)
+        transaction.on_commit(partial(
+            backfill_author, instance.user_id, instance.subscribing_id))
+
+
+@receiver(post_delete, sender=Subscription)
+def subscription_deleted(instance, **kwargs):
+    remove_follower(instance.subscribing_id)
+    remove_author(instance.user_id, instance.subscribing_id)
+
+
+@receiver(pre_save, sender=Recipe)
+@receiver(pre_save, sender=User)
+def media_changing(sender, instance, update_fields, **kwargs):
+    field = MEDIA_FIELDS[sender]
+    if update_fields is not None and field not in update_fields:
+        return
+    instance._previous_media = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list(field, flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=User)
+def media_changed(sender, instance, **kwargs):
+    if not hasattr(instance, '_previous_media'):
+        return
+    previous = instance.__dict__.pop('_previous_media') or None
+    current = getattr(instance, MEDIA_FIELDS[sender]).name or None
+    if previous != current:
+        acquire_blob(current)
+        release_blob(previous)
+
+
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=User)
+def media_deleted(sender, instance, **kwargs):
+    release_blob(getattr(instance, MEDIA_FIELDS[sender]).name)
+
+
+@receiver(post_save, sender=Favourite)
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_save, sender=Subscription)
+def user_list_added(sender, instance, created, **kwargs):
+    if created:
+        log_change(
+            CHANGE_KINDS[sender], ChangeLog.ADD,
+            instance.subscribing_id if sender is Subscription
+            else instance.recipe_id,
+            instance.user_id,
+        )
+
+
+@receiver(post_delete, sender=Favourite)
+@receiver(post_delete, sender=ShoppingCart)
+@receiver(post_delete, sender=Subscription)
+def user_list_removed(sender, instance, **kwargs):
+    log_change(
+        CHANGE_KINDS[sender], ChangeLog.REMOVE,
+        instance.subscribing_id if sender is Subscription
+        else instance.recipe_id,
+        instance.user_id,
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_edited(instance, created, update_fields, **kwargs):
+    if created:
+        return
+    if update_fields is None or set(update_fields) - {'short_link'}:
+        log_change(ChangeLog.RECIPE, ChangeLog.EDIT, instance.pk)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_removed(instance, **kwargs):
+    log_change(ChangeLog.RECIPE, ChangeLog.REMOVE, instance.pk)
@@ -0,0 +1,84 @@
+import hashlib
+import os
+import posixpath
+import tempfile
+import time
+from functools import partial
+
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from recipes.constants import MEDIA_DELETE_GRACE_SECONDS
+from recipes.models import MediaBlob
+
+
+def acquire_blob(name, count=1):
+    if not name:
+        return
+    if not MediaBlob.objects.filter(name=name).update(
+            refcount=F('refcount') + count):
+        MediaBlob.objects.get_or_create(name=name)
+        MediaBlob.objects.filter(name=name).update(
+            refcount=F('refcount') + count)
+
+
+def release_blob(name, count=1):
+    if not name:
+        return
+    MediaBlob.objects.filter(name=name).update(
+        refcount=Greatest(F('refcount') - count, 0))
+    transaction.on_commit(partial(delete_blob, name))
+
+
+def delete_blob(name):
+    try:
+        modified = os.path.getmtime(default_storage.path(name))
+    except (NotImplementedError, OSError):
+        return
+    if modified > time.time() - MEDIA_DELETE_GRACE_SECONDS:
+        return
+    if MediaBlob.objects.filter(name=name, refcount=0).delete()[0]:
+        default_storage.delete(name)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        directory, filename = posixpath.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        full_directory = self.path(directory)
+        os.makedirs(full_directory, exist_ok=True)
+        descriptor, temp_path = tempfile.mkstemp(
+            dir=full_directory, prefix='.upload-')
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(descriptor, 'wb') as temp_file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+            hexdigest = digest.hexdigest()
+            name = posixpath.join(
+                directory, hexdigest[:2], f'{hexdigest}{extension}')
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                os.remove(temp_path)
+                os.utime(full_path)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                os.chmod(temp_path, self.file_permissions_mode or 0o644)
+                os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        MediaBlob.objects.get_or_create(name=name)
+        return name
+
+    def delete(self, name):
+        if not MediaBlob.objects.filter(name=name, refcount__gt=0).exists():
+            super().delete(name)
@@ -0,0 +1,102 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from recipes.feed import get_feed
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from recipes.search import IngredientIndex
+from users.models import Subscription, User
+
+
+class FeedTests(TestCase):
+
+    def setUp(self):
+        self.author, self.first, self.second = (
+            User.objects.create_user(
+                email=f'{name}@example.com', username=name,
+                first_name=name, last_name=name, password='password')
+            for name in ('author', 'first', 'second')
+        )
+
+    def create_recipe(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Recipe.objects.create(
+                name='Рецепт', text='Текст', cooking_time=5,
+                author=self.author, image='recipes/images/test.png')
+
+    def subscribe(self, user):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Subscription.objects.create(
+                user=user, subscribing=self.author)
+
+    def test_followers_count(self):
+        self.subscribe(self.first)
+        subscription = self.subscribe(self.second)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.followers_count, 2)
+        subscription.delete()
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.followers_count, 1)
+
+    def test_push_feed(self):
+        self.subscribe(self.first)
+        recipe = self.create_recipe()
+        self.assertEqual(get_feed(self.first.pk, 10), [recipe.pk])
+
+    @mock.patch('recipes.feed.FEED_FANOUT_LIMIT', 1)
+    def test_pull_author_keeps_feed(self):
+        self.subscribe(self.first)
+        subscription = self.subscribe(self.second)
+        recipe = self.create_recipe()
+        self.assertEqual(get_feed(self.second.pk, 10), [recipe.pk])
+        subscription.delete()
+        self.author.refresh_from_db()
+        self.assertTrue(self.author.is_pull_author)
+        self.assertEqual(get_feed(self.first.pk, 10), [recipe.pk])
+
+
+class IngredientIndexTests(TestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='author', last_name='author', password='password')
+        self.salt, self.flour, self.eggs = (
+            Ingredient.objects.create(name=name, measurement_unit='г')
+            for name in ('соль', 'мука', 'яйца')
+        )
+        self.bread = self.create_recipe(self.salt, self.flour)
+        self.omelette = self.create_recipe(self.salt, self.eggs)
+        self.index = IngredientIndex()
+
+    def create_recipe(self, *ingredients):
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = Recipe.objects.create(
+                name='Рецепт', text='Текст', cooking_time=5,
+                author=self.author, image='recipes/images/test.png')
+            for ingredient in ingredients:
+                RecipeIngredient.objects.create(
+                    recipe=recipe, ingredient=ingredient, amount=1)
+        return recipe
+
+    def test_search_orders_by_coverage(self):
+        self.assertEqual(
+            list(self.index.search([self.salt.pk, self.flour.pk])),
+            [(self.bread.pk, 2, 0), (self.omelette.pk, 1, 1)],
+        )
+
+    def test_search_slices_top_results(self):
+        result = self.index.search([self.salt.pk, self.flour.pk])
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[1:2], [(self.omelette.pk, 1, 1)])
+
+    def test_search_sees_changes(self):
+        self.index.refresh()
+        with self.captureOnCommitCallbacks(execute=True):
+            RecipeIngredient.objects.create(
+                recipe=self.omelette, ingredient=self.flour, amount=1)
+        self.index.refresh()
+        self.assertEqual(
+            list(self.index.search([self.flour.pk, self.eggs.pk])),
+            [(self.omelette.pk, 2, 1), (self.bread.pk, 1, 1)],
+        )
@@ -0,0 +1,54 @@
+import time
+
+from django.core.cache import cache
+
+from recipes.constants import VERSION_TIMEOUT
+
+CATALOG_VERSION = 'catalog'
+PUBLIC_CONTENT_VERSION = 'public_content'
+POPULARITY_VERSION = 'popularity'
+PUBLIC_AUTHORS_VERSION = 'public_authors'
+
+
+def recipe_version(recipe_id):
+    return f'recipe:{recipe_id}'
+
+
+def author_version(user_id):
+    return f'author:{user_id}'
+
+
+def user_state_version(user_id):
+    return f'user_state:{user_id}'
+
+
+def membership_version(user_id):
+    return f'membership:{user_id}'
+
+
+def auth_version(user_id):
+    return f'auth:{user_id}'
+
+
+def get_versions(names):
+    keys = {f'version:{name}': name for name in names}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        version = time.time_ns()
+        cache.add(key, version, VERSION_TIMEOUT)
+        versions[key] = cache.get(key, version)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def get_version(name):
+    return get_versions([name])[name]
+
+
+def bump_version(name):
+    key = f'version:{name}'
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, VERSION_TIMEOUT)
+        return version
@@ -0,0 +1,21 @@
+#!/bin/sh
+# Периодические задачи: снимки раз в минуту, популярность раз в 5 минут,
+# похожие рецепты раз в час, очистка журнала и медиафайлов раз в сутки.
+minute=0
+while true; do
+  if [ -n "$SNAPSHOT_ROOT" ]; then
+    python manage.py publish_snapshots --workers 1
+  fi
+  if [ $((minute % 5)) -eq 0 ]; then
+    python manage.py rollup_trending
+  fi
+  if [ $((minute % 60)) -eq 0 ]; then
+    python manage.py compute_similar_recipes
+  fi
+  if [ $((minute % 1440)) -eq 0 ]; then
+    python manage.py compact_changelog
+    python manage.py gc_media
+  fi
+  minute=$((minute + 1))
+  sleep 60
+done
@@ -1,11 +1,14 @@
 from django.contrib import admin
 
+from recipes.paginators import EstimatedCountPaginator
 from users.models import User
 
 
 class UserAdmin(admin.ModelAdmin):
     list_display = ('email', 'username', 'first_name', 'last_name')
     search_fields = ('email', 'username',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = '-пусто-'
 
 
@@ -1,3 +1,11 @@
 EMEIL_LENGTH = 254
 NAME_LENGTH = 150
 PAGE_SIZE = 100
+TOKEN_CACHE_SIZE = 10000
+TOKEN_CACHE_TIMEOUT = 60
+TOKEN_SHARED_CACHE_TIMEOUT = 60 * 5
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+PUBLIC_USER_FIELDS = ('email', 'username', 'first_name', 'last_name', 'avatar')
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.16 on 2026-10-19 21:10
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+FEED_FANOUT_LIMIT = 10000
+
+
+def count_followers(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    Subscription = apps.get_model('users', 'Subscription')
+    User.objects.update(followers_count=Coalesce(Subquery(
+        Subscription.objects
+        .filter(subscribing=OuterRef('pk'))
+        .order_by()
+        .values('subscribing')
+        .annotate(total=Count('pk'))
+        .values('total')
+    ), 0))
+    User.objects.filter(followers_count__gt=FEED_FANOUT_LIMIT).update(
+        is_pull_author=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Подписчиков'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='is_pull_author',
+            field=models.BooleanField(default=False, verbose_name='Лента без рассылки'),
+        ),
+        migrations.RunPython(count_followers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-19 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_user_followers_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['avatar'], name='user_avatar_idx'),
+        ),
+    ]
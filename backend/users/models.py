@@ -33,6 +33,9 @@ class User(AbstractUser):
         unique=True,
         blank=False
     )
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
+    followers_count = models.PositiveIntegerField('Подписчиков', default=0)
+    is_pull_author = models.BooleanField('Лента без рассылки', default=False)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = (
@@ -46,6 +49,9 @@ class User(AbstractUser):
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
         ordering = ('id',)
+        indexes = [
+            models.Index(fields=['avatar'], name='user_avatar_idx'),
+        ]
 
     def __str__(self):
         return self.username
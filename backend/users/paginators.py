@@ -1,8 +1,62 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (BasePagination, PageNumberPagination,
+                                       _positive_int)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 
+from recipes.feed import get_feed
 from users.constants import PAGE_SIZE
 
 
 class CustomPagination(PageNumberPagination):
     page_size_query_param = 'limit'
     max_page_size = PAGE_SIZE
+
+
+class FeedPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = PAGE_SIZE
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_cursor(self, request):
+        if self.cursor_query_param not in request.query_params:
+            return None
+        try:
+            return _positive_int(
+                request.query_params[self.cursor_query_param], strict=True)
+        except ValueError:
+            raise NotFound('Неверный курсор.')
+
+    def paginate_feed(self, request, user):
+        self.request = request
+        page_size = self.get_page_size(request)
+        recipe_ids = get_feed(user.id, page_size + 1, self.get_cursor(request))
+        self.has_next = len(recipe_ids) > page_size
+        return recipe_ids[:page_size]
+
+    def get_next_link(self, recipe_ids):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            recipe_ids[-1],
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link([item['id'] for item in data]),
+            'results': data,
+        })
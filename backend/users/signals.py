@@ -0,0 +1,28 @@
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from api.authentication import CachedTokenAuthentication, token_cache_key
+from recipes.versions import auth_version, bump_version
+from users.models import User
+
+
+def invalidate_token(key, user_id):
+    CachedTokenAuthentication.local_cache.delete(key)
+    cache.delete(token_cache_key(key))
+    bump_version(auth_version(user_id))
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(instance, **kwargs):
+    transaction.on_commit(
+        partial(invalidate_token, instance.key, instance.user_id))
+
+
+@receiver(post_save, sender=User)
+def user_changed(instance, **kwargs):
+    transaction.on_commit(partial(bump_version, auth_version(instance.pk)))
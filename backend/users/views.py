@@ -1,12 +1,15 @@
+from django.db.models import Count, Max
 from django.shortcuts import get_object_or_404
 from djoser.views import UserViewSet
 from rest_framework import permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from api.serializers import SubscribeSerializer
+from api.conditional import conditional
+from api.serializers import RecipeReadSerializer, SubscribeSerializer
+from recipes.models import Recipe
 from users.models import Subscription, User
-from users.paginators import CustomPagination
+from users.paginators import CustomPagination, FeedPagination
 from users.serializers import UserAvatarSerializer, UserSerializer
 
 
@@ -16,11 +19,43 @@ class UserViewSet(UserViewSet):
     permission_classes = []
     pagination_class = CustomPagination
 
+    def get_profile_state(self, request, *args, **kwargs):
+        user_id = request.user.pk if self.action == 'me' else kwargs['id']
+        try:
+            return (
+                User.objects
+                .filter(pk=user_id)
+                .values_list('updated_at')
+                .first()
+            )
+        except ValueError:
+            return None
+
+    def get_subscriptions_state(self, request, *args, **kwargs):
+        subscriptions = Subscription.objects.filter(
+            user=request.user
+        ).aggregate(
+            total=Count('id'),
+            updated_at=Max('subscribing__updated_at'),
+        )
+        recipes = Recipe.objects.filter(
+            author__subscribing__user=request.user
+        ).aggregate(
+            total=Count('id'),
+            updated_at=Max('updated_at'),
+        )
+        return (*subscriptions.values(), *recipes.values())
+
+    @conditional('get_profile_state')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     @action(
         detail=False, methods=['get'],
         url_path='me',
         permission_classes=[permissions.IsAuthenticated]
     )
+    @conditional('get_profile_state')
     def me(self, request):
         user = request.user
         user_me = get_object_or_404(User, id=user.id)
@@ -64,6 +99,7 @@ class UserViewSet(UserViewSet):
         url_path='subscriptions',
         permission_classes=[permissions.IsAuthenticated]
     )
+    @conditional('get_subscriptions_state')
     def subscriptions(self, request):
         user_subscriptions = Subscription.objects.filter(
             user=self.request.user)
@@ -73,6 +109,25 @@ class UserViewSet(UserViewSet):
                                          many=True)
         return self.get_paginated_response(serializer.data)
 
+    @action(
+        detail=False, methods=['get'],
+        url_path='feed',
+        permission_classes=[permissions.IsAuthenticated]
+    )
+    def feed(self, request):
+        paginator = FeedPagination()
+        recipe_ids = paginator.paginate_feed(request, request.user)
+        recipes = (
+            Recipe.objects
+            .filter(id__in=recipe_ids)
+            .select_related('author')
+            .prefetch_related('tags', 'recipe_ingredients__ingredient')
+        )
+        serializer = RecipeReadSerializer(recipes,
+                                          context={'request': request},
+                                          many=True)
+        return paginator.get_paginated_response(serializer.data)
+
     @action(
         detail=False, methods=['put'],
         url_path='me/avatar',